@@ -6,17 +6,22 @@ Public interface of the *control* package.
 Exports
 -------
 * build_robust_mpc  – factory that constructs the tightened “tube” MPC
+* MPCController     – warm-started callable wrapper around any MPC solver
 * mpc_robust        – convenience helper that wraps `build_robust_mpc`
                       into a callable controller `u = f(x)`
+* mpc_robust_batch  – first robust-MPC input for a whole batch of states,
+                      solved in parallel threads
 """
 
 # --------------------------------------------------------------------------- #
 # 1. Public symbols --------------------------------------------------------- #
 # --------------------------------------------------------------------------- #
 from .robust import build_robust_mpc          # main factory for robust MPC
+from .controller import MPCController         # warm-started controller wrapper
 from core.params import default as P_default  # nominal process constants
 
 from typing import Callable, Any
+import os
 import numpy as np
 
 
@@ -27,13 +32,15 @@ def mpc_robust(
     N: int = 20,
     *,
     params: Any = P_default,
+    **build_kw: Any,
 ) -> Callable[[np.ndarray], float]:
     """
     Tube-based robust MPC controller (spec-tracking mode).
 
     This is just a *thin* wrapper around ``build_robust_mpc``.  It hides all
-    the low-level solver plumbing and returns a clean Python function that
-    maps the current state ``x`` → first control input ``u``.
+    the low-level solver plumbing and returns a warm-started callable
+    (`MPCController`) that maps the current state ``x`` → first control
+    input ``u``.
 
     Parameters
     ----------
@@ -42,6 +49,9 @@ def mpc_robust(
     params : core.params.ProcessParams, optional
         Process constants.  The default is the nominal parameter set
         ``core.params.default`` (imported above as *P_default*).
+    **build_kw
+        Solver build options forwarded to ``build_mpc`` – e.g.
+        ``jit=True`` or ``codegen=True`` to compile the NLP callbacks.
 
     Returns
     -------
@@ -58,37 +68,58 @@ def mpc_robust(
     #        • LBG    : lower bounds on g                                   #
     #        • UBG    : upper bounds on g                                   #
     # --------------------------------------------------------------------- #
-    solver, meta, LBG, UBG = build_robust_mpc(horizon=N, params=params)
+    solver, meta, LBG, UBG = build_robust_mpc(horizon=N, params=params, **build_kw)
 
     # --------------------------------------------------------------------- #
-    # 2.2  Wrap the solver call into a pure-Python controller.              #
-    #      The user never sees CasADi directly.                             #
+    # 2.2  Wrap the solver into a stateful controller.                      #
+    #      The first call cold-starts (state repeated, u = u_init); every   #
+    #      later call starts IPOPT from the previous primal/dual solution   #
+    #      shifted one stage forward.  simulate() calls reset() per batch.  #
     # --------------------------------------------------------------------- #
-    def _ctrl(state: np.ndarray) -> float:
-        """
-        Solve the MPC problem for *state* and return the first input u₀.
-
-        The decision vector the solver expects is:
-
-            [ V₀, ML₀, V₁, ML₁, …, V_N, ML_N,  u₀, u₁, …, u_{N-1} ]
-
-        * Warm-start trick *:
-          - Repeat the *current* state (V, ML) for all N+1 state nodes.
-          - Use `meta["u_init"]` (e.g. a flat 0.5 profile) for the inputs.
-          This speeds up IPOPT convergence considerably.
-        """
-        # Build the initial guess x0  (length = 2·(N+1) + N)
-        x0 = np.hstack([
-            np.tile(state, meta["N"] + 1),   # state trajectory guess
-            meta["u_init"]                   # input trajectory guess
-        ])
-
-        # Solve the NLP:  minimise J  s.t.  g_L ≤ g ≤ g_U
-        sol = solver(x0=x0, p=state, lbg=LBG, ubg=UBG)
-
-        # Extract the optimal input sequence and return the first element
-        u_opt = sol["x"].full().ravel()[meta["Uslice"]]  # slice = inputs only
-        return float(u_opt[0])
-
-    # Return the callable controller
-    return _ctrl
+    return MPCController(solver, meta, LBG, UBG)
+
+
+# --------------------------------------------------------------------------- #
+# 3. Batch evaluation ------------------------------------------------------- #
+# --------------------------------------------------------------------------- #
+def mpc_robust_batch(
+    states: np.ndarray,
+    N: int = 20,
+    *,
+    params: Any = P_default,
+    n_threads: int | None = None,
+    **build_kw: Any,
+) -> np.ndarray:
+    """
+    First robust-MPC input for many states at once (Monte-Carlo studies,
+    warm-up sweeps).
+
+    The solver is mapped over the batch with CasADi's ``"thread"``
+    parallelisation; every thread gets its own IPOPT memory, so the
+    solves are independent cold starts (no warm start between columns).
+
+    Parameters
+    ----------
+    states : ndarray(2, B)
+        One state [V, ML] per column.
+    N, params, **build_kw
+        As for `mpc_robust`.
+    n_threads : int, optional
+        Worker threads.  Defaults to the number of CPUs.
+
+    Returns
+    -------
+    u0 : ndarray(B,) – first valve position per state
+    """
+    states = np.asarray(states, dtype=float).reshape(2, -1)
+    B = states.shape[1]
+    solver, meta, LBG, UBG = build_robust_mpc(horizon=N, params=params, **build_kw)
+
+    # cold-start guess per column: state repeated, u = u_init
+    W0 = np.vstack([np.tile(states, (meta["N"] + 1, 1)),
+                    np.tile(meta["u_init"][:, None], (1, B))])
+
+    batch = solver.map(B, "thread", min(B, n_threads or os.cpu_count() or 1))
+    sol = batch(x0=W0, p=states, lbg=np.tile(LBG[:, None], (1, B)),
+                ubg=np.tile(UBG[:, None], (1, B)))
+    return sol["x"][meta["Uslice"].start, :].full().ravel()
@@ -12,14 +12,24 @@ Usage patterns
 
 from __future__ import annotations
 
+import ctypes
+import hashlib
+import os
+import platform
+import shutil
+import subprocess
+import warnings
+from functools import lru_cache
+from pathlib import Path
+
 import casadi as ca
 import numpy as np
 from typing import Literal, Optional
 
 from core.params     import default as P_default         # nominal constants
-from core.dynamics   import casadi_rhs                   # continuous RHS
-from core.discretise import rk4_disc                     # RK4 discretiser
-from core.tariff     import lambda_tou                   # TOU tariff (€/kWh)
+from core.dynamics   import casadi_rhs                   # cached model RHS
+from core.discretise import rk4_model                    # cached RK4 map
+from core.tariff     import lambda_tou, lambda_tou_vec   # TOU tariff (€/kWh)
 
 # --------------------------------------------------------------------------- #
 # 0.  Type alias for the mode selector                                        #
@@ -53,178 +63,419 @@ _W = dict(
     rho_energy = 1.0,     # multiplies λ(t) ⋅ u ⋅ Δt   if lambda_fun supplied
 )
 
+# Solver back-ends accepted by build_mpc(..., solver=…) and their options.
+#   "ipopt"     : interior point (default, most robust on this problem)
+#   "sqpmethod" : SQP with qpOASES sub-problems – cheap per step when the
+#                 previous solution is passed back in as warm start
+_SOLVER_OPTS = dict(
+    ipopt = {
+        "ipopt.print_level": 0,
+        "print_time": False,
+    },
+    sqpmethod = {
+        "qpsol":         "qpoases",
+        "qpsol_options": {"printLevel": "none", "error_on_fail": False},
+        "print_header":  False,
+        "print_iteration": False,
+        "print_status":  False,
+        "print_time":    False,
+        "error_on_fail": False,
+        "max_iter":      50,
+    },
+)
+
+# Extra options of the warm-start variant (meta["solver_warm"]).  Only valid
+# when the caller passes a converged primal/dual pair: with zero or stale
+# multipliers IPOPT's warm-start initialisation is worse than a cold start.
+_WARM_OPTS = dict(
+    ipopt = {
+        "ipopt.warm_start_init_point":     "yes",
+        "ipopt.warm_start_bound_push":      1e-9,
+        "ipopt.warm_start_mult_bound_push": 1e-9,
+        "ipopt.mu_strategy":               "adaptive",
+    },
+    sqpmethod = {},                 # SQP uses x0 / lam_x0 / lam_g0 as given
+)
+
+# IPOPT barrier update of the cold-start solver, per MPC mode.  Cold solves
+# carry most of the closed loop whenever solves fail (econ never converges
+# here, time_opt mostly not): monotone is ~15x faster for time_opt, adaptive
+# for econ and about even for spec.  The warm solver always uses adaptive.
+_COLD_MU = dict(spec="adaptive", econ="adaptive", time_opt="monotone")
+
+# IPOPT linear solver: HSL MA57 if an HSL library (coinhsl) can be loaded,
+# otherwise IPOPT's bundled MUMPS.  MA57 factorises the small KKT systems
+# of this problem faster; set DIAFILTRATION_HSLLIB to point at a custom build.
+def _find_hsl() -> Optional[str]:
+    for lib in filter(None, (os.environ.get("DIAFILTRATION_HSLLIB"),
+                             "libhsl.so", "libcoinhsl.so")):
+        try:
+            ctypes.CDLL(lib)
+        except OSError:
+            continue
+        return lib
+    return None
+
+
+_HSL_LIB = _find_hsl()
+if _HSL_LIB is not None:
+    _SOLVER_OPTS["ipopt"].update({
+        "ipopt.linear_solver": "ma57",
+        "ipopt.hsllib":        _HSL_LIB,
+    })
+
+# Compiled NLP callbacks (build_mpc(..., codegen=True)) are cached here,
+# keyed by a hash of the generated C source, the CasADi version and the
+# host CPU (see _host_target), so a library survives reboots and is never
+# loaded by a different CasADi or on a CPU lacking its instructions (e.g.
+# a home directory shared by hosts of different CPU generations).
+_CODEGEN_DIR   = Path(os.environ.get("XDG_CACHE_HOME")
+                      or Path.home() / ".cache") / "diafiltration"
+_CODEGEN_FLAGS = ["-O3", "-march=native", "-fPIC", "-shared"]
+
+# In-memory alternative (build_mpc(..., jit=True)): CasADi compiles the
+# callbacks itself on every build.  -O1 compiles ~10 s faster than -O3
+# with the same solve time on this problem.
+_JIT_OPTS = {
+    "jit":         True,
+    "compiler":    "shell",
+    "jit_options": {"flags": ["-O1"], "verbose": False},
+}
+
+# Both compiled paths need a C compiler; without one we fall back to the
+# SX virtual machine (same results, just slower function evaluations).
+_HAVE_CC = shutil.which("gcc") is not None
+
 
 # --------------------------------------------------------------------------- #
-# 2.  Main factory function                                                   #
+# 2.  Receding-horizon shift helper                                           #
 # --------------------------------------------------------------------------- #
-def build_mpc(
-    *args,
-    mode: _Mode = "spec",
-    horizon: Optional[int] = None,
-    params=P_default,
-    weights: Optional[dict] = None,
-):
+def _shift_index(n_blocks: int, width: int, offset: int = 0) -> np.ndarray:
     """
-    Build a CasADi NLP solver for the chosen MPC flavour.
+    Index map that moves every block of *width* entries one stage forward
+    and repeats the last block, e.g. (3 blocks, width 1) → [1, 2, 2].
+    Used to shift a previous MPC solution (primal or dual) by one step.
+    """
+    idx = np.arange(n_blocks * width).reshape(n_blocks, width)
+    return offset + np.vstack([idx[1:], idx[-1:]]).ravel()
 
-    Parameters
-    ----------
-    mode     : {"spec", "econ", "time_opt"}
-        Objective formulation (see top-level docstring).
-    horizon  : int
-        Prediction horizon N (number of control intervals).
-        If omitted defaults to 20.
-    params   : core.params.ProcessParams
-        Physical / process constants (default = nominal set).
-    weights  : dict, optional
-        Override any entry of the global _W dictionary.  This can also
-        include a key ``"lambda_fun"`` mapping *t [s]* → tariff [€/kWh].
 
-    Returns
-    -------
-    solver : casadi.nlpsol
-    meta   : dict   – contains {"N", "Uslice", "u_init"}
-    LBG    : np.ndarray – lower bounds for g
-    UBG    : np.ndarray – upper bounds for g
+def _smooth_pos(z, eps: float = 1e-6):
     """
-    # --------------------------------------------------------------------- #
-    # 2.1  Parse legacy positional syntax                                   #
-    #       e.g. build_mpc(25) or build_mpc("econ", 30)                     #
-    # --------------------------------------------------------------------- #
-    if args:
-        if len(args) == 1 and isinstance(args[0], int):
-            horizon, = args
-        elif len(args) == 2 and isinstance(args[0], str) and isinstance(args[1], int):
-            mode, horizon = args        # type: ignore[assignment]
-        else:
-            raise TypeError("build_mpc: use (N), (mode, N) or keyword arguments")
+    Twice-differentiable stand-in for max(z, 0):  ½·(z + √(z² + ε)).
+    Deviates from the kink by at most √ε/2, but gives IPOPT a continuous
+    Hessian across the switching point.
+    """
+    return 0.5 * (z + ca.sqrt(z * z + eps))
+
 
-    horizon = horizon or 20                     # default horizon
-    w = {**_W, **(weights or {})}               # merge weight overrides
+@lru_cache(maxsize=1)
+def _host_target() -> str:
+    """
+    Machine name plus the target flags gcc resolves ``-march=native`` to
+    (CPU model and ISA extensions), as part of the codegen cache key.
+    """
+    out = subprocess.run(["gcc", "-march=native", "-E", "-v", "-"],
+                         input="", capture_output=True, text=True).stderr
+    cc1 = next((ln for ln in out.splitlines() if "cc1" in ln), "")
+    return " ".join([platform.machine(),
+                     *(f for f in cc1.split() if f.startswith("-m"))])
+
+
+def _codegen_library(plugin: str, nlp: dict, opts: dict) -> str:
+    """
+    Generate C code for the NLP callbacks (f, g, ∇f, ∂g/∂x, ∇²L), compile
+    it to a shared library and return its path (for ``ca.nlpsol``).
+    The library is reused across calls and processes as long as the
+    generated source is identical.
+    """
+    proto = ca.nlpsol("solver", plugin, nlp, opts)
+    cg    = ca.CodeGenerator("nlp.c")
+    cg.add(proto.oracle())                      # exported as "nlp"
+    for fname in proto.get_function():
+        cg.add(proto.get_function(fname))
+    src = cg.dump()
+
+    tag = " ".join([ca.__version__, _host_target(), *_CODEGEN_FLAGS])
+    key = hashlib.sha1((tag + "\n" + src).encode()).hexdigest()[:16]
+    lib = _CODEGEN_DIR / f"nlp_{key}.so"
+    if not lib.exists():
+        _CODEGEN_DIR.mkdir(parents=True, exist_ok=True)
+        c_file = _CODEGEN_DIR / f"nlp_{key}.c"
+        tmp    = _CODEGEN_DIR / f"nlp_{key}.{os.getpid()}.so"
+        c_file.write_text(src)
+        subprocess.run(["gcc", *_CODEGEN_FLAGS, str(c_file), "-o", str(tmp)],
+                       check=True)
+        os.replace(tmp, lib)                    # atomic w.r.t. other workers
+
+    return str(lib)
+
+
+# --------------------------------------------------------------------------- #
+# 3.  Solver construction (memoised per problem)                              #
+# --------------------------------------------------------------------------- #
+@lru_cache(maxsize=32)
+def _build_cached(
+    mode: _Mode,
+    horizon: int,
+    params,
+    weights: tuple,
+    solver: str,
+    codegen: bool,
+    jit: bool,
+):
+    """
+    Build solver, metadata and constraint bounds for one MPC problem.
+
+    Cached on all arguments (``params`` is a frozen dataclass and
+    ``weights`` a sorted tuple of items), so constructing another
+    controller for the same problem skips graph building and any
+    compilation.  Call build_mpc() – it copies the mutable outputs.
+    """
+    w = {**_W, **dict(weights)}                 # merge weight overrides
 
     # --------------------------------------------------------------------- #
-    # 2.2  Obtain discrete-time model  x_{k+1} = F(x_k, u_k)                #
+    # 3.1  Obtain discrete-time model  x_{k+1} = F(x_k, u_k)                #
     # --------------------------------------------------------------------- #
-    F = rk4_disc(casadi_rhs(params), params.dt_ctrl)
+    F = rk4_model(params, params.dt_ctrl)       # shared across horizons
+
+    # process constants used below
+    MP, dt = params.MP, params.dt_ctrl
+    cP_star, cL_star, cL_max = params.cP_star, params.cL_star, params.cL_max
 
     # --------------------------------------------------------------------- #
-    # 2.3  Declare decision variables                                       #
+    # 3.2  Declare decision variables                                       #
     #       X : 2 × (N+1)  – [V, ML] trajectory                             #
-    #       U : N          – valve openings in [0, 1]                       #
+    #       U : 1 × N      – valve openings in [0, 1]                       #
     # --------------------------------------------------------------------- #
     X  = ca.SX.sym("X", 2, horizon + 1)
-    U  = ca.SX.sym("U", horizon)
+    U  = ca.SX.sym("U", 1, horizon)
     X0 = ca.SX.sym("X0", 2)                      # current state parameter
 
-    # Containers for constraints and objective
+    # Containers for constraints and objective (bounds kept as NumPy blocks)
     g, lbg, ubg = [], [], []
     J = 0.0
 
     # --------------------------------------------------------------------- #
-    # 2.4  Initial-state equality                                           #
+    # 3.3  Initial-state equality                                           #
     # --------------------------------------------------------------------- #
     g   += [X[:, 0] - X0]
-    lbg += [0, 0]
-    ubg += [0, 0]
-
-    # --------------------------------------------------------------------- #
-    # 2.5  Horizon loop                                                     #
-    # --------------------------------------------------------------------- #
-    for k in range(horizon):
-        # ----  dynamics -------------------------------------------------- #
-        g   += [X[:, k + 1] - F(X[:, k], U[k])]
-        lbg += [0, 0]
-        ubg += [0, 0]
-
-        # ----  input bounds  0 ≤ u ≤ 1 ----------------------------------- #
-        g   += [U[k]]
-        lbg += [0.0]
-        ubg += [1.0]
-
-        # ----  extract current concentrations ---------------------------- #
-        V_k, ML_k = X[0, k], X[1, k]
-        cP_k      = params.MP / V_k
-        cL_k      = ML_k / V_k
-
-        # ----  hard path constraints ------------------------------------- #
-        g   += [cP_k]                # protein must stay ≤ target
-        lbg += [0.0]
-        ubg += [params.cP_star]
-
-        g   += [cL_k]                # lactose must stay ≤ max allowed
-        lbg += [-ca.inf]
-        ubg += [params.cL_max]
-
-        # ----  stage cost per mode --------------------------------------- #
-        if mode == "spec":
-            # • quadratic slack tracking
-            sL = ca.fmax(cL_k - params.cL_star, 0)
-            sP = ca.fmax(params.cP_star - cP_k, 0)
-            J += (sL**2 + sP**2)
-            # J += w["rho_time"] * params.dt_ctrl
-            # J += w["rho_u_spec"] * (1 - U[k])**2
-            # J += w["rho_V"] * V_k * params.dt_ctrl
-
-        elif mode == "econ":
-            # • linear “economic” formulation (no squares)
-            sL = ca.fmax(cL_k - params.cL_star, 0)
-            sP = ca.fmax(params.cP_star - cP_k, 0)
-            J += params.dt_ctrl                        # clock term (1 × Δt)
-            J += w["rho_L_lin"] * sL * params.dt_ctrl
-            J += w["rho_P_lin"] * sP * params.dt_ctrl
-            J += w["rho_u"] * (1 - U[k])**2            # light smoothing
-
-        elif mode == "time_opt":
-            # • new “economical” time-optimal objective (suggested by user)
-            #   maximise Σ cP   –  minimise Σ Δt   –  penalise lactose overshoot
-            J += -cP_k                               # maximise protein yield
-            J += 10.0 * params.dt_ctrl              # heavy clock cost
-            J += ca.fmax(cL_k - params.cL_max, 0)   # lactose penalty
-            J += w["rho_u"] * (1 - U[k])**2         # keep some smoothness
+    lbg += [np.zeros(2)]
+    ubg += [np.zeros(2)]
 
-        else:
-            raise ValueError(f"Unknown mode '{mode}'")
+    # --------------------------------------------------------------------- #
+    # 3.4  Dynamics – all N RK4 steps in one mapped call                    #
+    #       x_{k+1} − F(x_k, u_k) = 0   for k = 0 … N−1                     #
+    # --------------------------------------------------------------------- #
+    X_next = F.map(horizon)(X[:, :-1], U)         # 2 × N predicted states
+    g   += [ca.vec(X[:, 1:] - X_next)]
+    lbg += [np.zeros(2 * horizon)]
+    ubg += [np.zeros(2 * horizon)]
 
-        # ---- optional TOU-energy term (used by spec/econ) --------------- #
-        if "lambda_fun" in w:
-            lam_k = w["lambda_fun"](k * params.dt_ctrl)  # €/kWh at this time
-            J += w["rho_energy"] * lam_k * U[k] * params.dt_ctrl
+    # --------------------------------------------------------------------- #
+    # 3.5  Input bounds, path constraints and stage cost                    #
+    #       One scalar stage Function  (x_k, u_k) → ([u_k, cP_k, cL_k], ℓ_k)  #
+    #       mapped over all N stages, like the dynamics above               #
+    # --------------------------------------------------------------------- #
+    x_s = ca.SX.sym("x", 2)
+    u_s = ca.SX.sym("u")
+    inv_V = 1.0 / x_s[0]                          # shared 1/V
+    cP_s  = MP * inv_V
+    cL_s  = x_s[1] * inv_V
+
+    if mode == "spec":
+        # • quadratic slack tracking
+        sL = ca.fmax(cL_s - cL_star, 0)
+        sP = ca.fmax(cP_star - cP_s, 0)
+        l_s = sL**2 + sP**2
+
+    elif mode == "econ":
+        # • linear “economic” formulation (no squares)
+        sL = ca.fmax(cL_s - cL_star, 0)
+        sP = ca.fmax(cP_star - cP_s, 0)
+        l_s = (dt                                     # clock term (1 × Δt)
+               + w["rho_L_lin"] * sL * dt
+               + w["rho_P_lin"] * sP * dt
+               + w["rho_u"] * (1 - u_s)**2)           # light smoothing
+
+    elif mode == "time_opt":
+        # • “economical” time-optimal objective
+        #   maximise Σ cP   –  minimise Σ Δt   –  penalise lactose overshoot
+        l_s = (-cP_s                                  # maximise protein yield
+               + 10.0 * dt                            # heavy clock cost
+               + _smooth_pos(cL_s - cL_max)           # lactose penalty
+               + w["rho_u"] * (1 - u_s)**2)           # keep some smoothness
+
+    else:
+        raise ValueError(f"Unknown mode '{mode}'")
+
+    stage = ca.Function("stage", [x_s, u_s], [ca.vertcat(u_s, cP_s, cL_s), l_s])
+    G_k, L_k = stage.map(horizon)(X[:, :-1], U)   # 3 × N,  1 × N
+
+    g   += [ca.vec(G_k)]                          # stage-interleaved
+    lbg += [np.tile([0.0, 0.0, -np.inf], horizon)]
+    ubg += [np.tile([1.0, cP_star, cL_max], horizon)]
+    J   += ca.sum2(L_k)
+
+    # ---- optional TOU-energy term (used by spec/econ) ------------------- #
+    if "lambda_fun" in w:
+        lam_fun, t_k = w["lambda_fun"], np.arange(horizon) * dt
+        lam = (lambda_tou_vec(t_k) if lam_fun is lambda_tou
+               else np.array([lam_fun(t) for t in t_k]))
+        J += w["rho_energy"] * dt * ca.dot(ca.DM(lam), U.T)
 
     # --------------------------------------------------------------------- #
-    # 2.6  Terminal specification (soft equality)                           #
+    # 3.6  Terminal specification (soft equality)                           #
     # --------------------------------------------------------------------- #
-    V_N, ML_N = X[0, -1], X[1, -1]
-    cP_N      = params.MP / V_N
-    cL_N      = ML_N / V_N
+    cP_N, cL_N = ca.vertsplit(stage(X[:, -1], 0)[0][1:])  # same expressions at x_N
 
     eps = 1e-1                                    # small slack for cP lower bound
     g   += [cP_N, cL_N]
-    lbg += [params.cP_star - eps, 0.0]
-    ubg += [params.cP_star,        params.cL_star]
+    lbg += [np.array([cP_star - eps, 0.0])]
+    ubg += [np.array([cP_star,       cL_star])]
+    lbg, ubg = np.concatenate(lbg), np.concatenate(ubg)
 
     # --------------------------------------------------------------------- #
-    # 2.7  Create CasADi NLP solver (IPOPT backend)                          #
+    # 3.7  Create CasADi NLP solver (IPOPT by default)                      #
     # --------------------------------------------------------------------- #
+    if solver not in _SOLVER_OPTS:
+        raise ValueError(f"Unknown solver '{solver}'")
+    if codegen and jit:
+        raise ValueError("build_mpc: choose either codegen or jit, not both")
+    if (codegen or jit) and not _HAVE_CC:
+        warnings.warn("build_mpc: no C compiler (gcc) found – "
+                      "building the NLP without codegen/JIT")
+        codegen = jit = False
+    opts = {**_SOLVER_OPTS[solver], **(_JIT_OPTS if jit else {})}
+    if solver == "ipopt":
+        opts["ipopt.mu_strategy"] = _COLD_MU[mode]
+
     nlp = dict(
         f = J,
-        x = ca.vertcat(ca.reshape(X, -1, 1), U),  # decision vector
+        x = ca.vertcat(ca.vec(X), ca.vec(U)),     # decision vector
         p = X0,                                   # parameter = current state
-        g = ca.vertcat(*g),                       # constraints
-    )
-    solver = ca.nlpsol(
-        "solver", "ipopt", nlp,
-        {"ipopt.print_level": 0, "print_time": False},
+        g = ca.vertcat(*g),                       # constraints (4 blocks)
     )
+    # cold-start solver plus, if the back-end has warm-start options, a
+    # second instance on the same NLP (same compiled library) that uses them
+    plugin = solver
+    src    = _codegen_library(plugin, nlp, opts) if codegen else nlp
+    solver = ca.nlpsol("solver", plugin, src, opts)
+    solver_warm = (ca.nlpsol("solver_warm", plugin, src,
+                             {**opts, **_WARM_OPTS[plugin]})
+                   if _WARM_OPTS[plugin] else solver)
 
     # --------------------------------------------------------------------- #
-    # 2.8  Helper metadata for the caller                                   #
+    # 3.8  Helper metadata for the caller                                   #
+    #       decision vector  w = [ V₀, ML₀, …, V_N, ML_N,  u₀, …, u_{N-1} ] #
     # --------------------------------------------------------------------- #
+    nX = 2 * (horizon + 1)                          # number of state entries
     meta = dict(
         N       = horizon,
-        Uslice  = slice(2 * (horizon + 1), None),   # slice that extracts U from x
+        nx      = 2,                                # states per node
+        nw      = nX + horizon,                     # length of decision vector
+        Xslice  = slice(0, nX),                     # slice that extracts X from x
+        Uslice  = slice(nX, None),                  # slice that extracts U from x
+        F       = F,                                # discrete model x⁺ = F(x, u)
+        solver_warm = solver_warm,                  # for converged (w, λ) guesses
+        # one-step shift maps for warm starts:  w⁺ = w[w_shift], λ⁺ = λ[g_shift]
+        w_shift = np.concatenate([
+            _shift_index(horizon + 1, 2),           # states  (x_N is re-predicted)
+            _shift_index(horizon, 1, nX),           # inputs  (u_{N-1} held)
+        ]),
+        g_shift = np.concatenate([
+            np.arange(2),                           # initial-state equality
+            _shift_index(horizon, 2, 2),            # dynamics
+            _shift_index(horizon, 3, 2 + 2 * horizon),  # input / path constraints
+            np.arange(len(lbg) - 2, len(lbg)),      # terminal specification
+        ]),
+        # rows of g holding the cL ≤ cL_max path bounds (stage order) – lets
+        # callers change cL_max through UBG without rebuilding the NLP
+        cL_path = 2 + 2 * horizon + 3 * np.arange(horizon) + 2,
         u_init  = np.ones(horizon) if mode == "time_opt"
                   else 0.5 * np.ones(horizon),
     )
 
     # Return everything the higher-level code needs
-    return solver, meta, np.array(lbg), np.array(ubg)
+    return solver, meta, lbg, ubg
+
+
+def clear_cache() -> None:
+    """Forget all memoised solvers and discrete models (e.g. after edits)."""
+    _build_cached.cache_clear()
+    rk4_model.cache_clear()
+    casadi_rhs.cache_clear()
+
+
+# --------------------------------------------------------------------------- #
+# 4.  Main factory function                                                   #
+# --------------------------------------------------------------------------- #
+def build_mpc(
+    *args,
+    mode: _Mode = "spec",
+    horizon: Optional[int] = None,
+    params=P_default,
+    weights: Optional[dict] = None,
+    solver: str = "ipopt",
+    codegen: bool = False,
+    jit: bool = False,
+):
+    """
+    Build a CasADi NLP solver for the chosen MPC flavour.
+
+    Parameters
+    ----------
+    mode     : {"spec", "econ", "time_opt"}
+        Objective formulation (see top-level docstring).
+    horizon  : int
+        Prediction horizon N (number of control intervals).
+        If omitted defaults to 20.
+    params   : core.params.ProcessParams
+        Physical / process constants (default = nominal set).
+    weights  : dict, optional
+        Override any entry of the global _W dictionary.  This can also
+        include a key ``"lambda_fun"`` mapping *t [s]* → tariff [€/kWh].
+    solver   : {"ipopt", "sqpmethod"}
+        NLP back-end (see _SOLVER_OPTS).  IPOPT is the default.
+        "sqpmethod" is experimental: its steps often stop without
+        converging (indefinite Hessian), so closed loops end elsewhere –
+        the nominal spec loop (N=20) stops after 33 steps at cP ≈ 287,
+        cL ≈ 14.8, overshooting cP*.  qpOASES prints its banner to stdout.
+    codegen  : bool
+        Compile the NLP callbacks to C with gcc (cached on disk under
+        _CODEGEN_DIR).  The first build of a new problem takes ~20 s.
+    jit      : bool
+        JIT-compile the callbacks in memory instead (not cached on disk).
+
+    Returns
+    -------
+    solver : casadi.nlpsol
+    meta   : dict   – contains {"N", "Uslice", "u_init", "solver_warm", …}
+    LBG    : np.ndarray – lower bounds for g
+    UBG    : np.ndarray – upper bounds for g
+    """
+    # --------------------------------------------------------------------- #
+    # 4.1  Parse legacy positional syntax                                   #
+    #       e.g. build_mpc(25) or build_mpc("econ", 30)                     #
+    # --------------------------------------------------------------------- #
+    if args:
+        if len(args) == 1 and isinstance(args[0], int):
+            horizon, = args
+        elif len(args) == 2 and isinstance(args[0], str) and isinstance(args[1], int):
+            mode, horizon = args        # type: ignore[assignment]
+        else:
+            raise TypeError("build_mpc: use (N), (mode, N) or keyword arguments")
+
+    horizon = 20 if horizon is None else horizon    # default horizon
+    if horizon < 1:
+        raise ValueError(f"build_mpc: horizon must be >= 1, got {horizon}")
+
+    # --------------------------------------------------------------------- #
+    # 4.2  Fetch (or build) the solver; hand out private copies of the      #
+    #       mutable outputs since callers may tighten UBG / extend meta     #
+    # --------------------------------------------------------------------- #
+    nlp_solver, meta, lbg, ubg = _build_cached(
+        mode, horizon, params, tuple(sorted((weights or {}).items())),
+        solver, codegen, jit,
+    )
+    return nlp_solver, dict(meta), lbg.copy(), ubg.copy()
@@ -0,0 +1,124 @@
+"""
+control/controller.py
+──────────────────────
+Stateful MPC controller shared by every MPC flavour in the project.
+
+`MPCController` takes the (solver, meta, LBG, UBG) tuple produced by
+`build_mpc` or `build_robust_mpc` and turns it into a callable
+``u = ctrl(state)`` that warm-starts each solve from the shifted previous
+solution.
+"""
+
+from __future__ import annotations
+import numpy as np
+
+
+class MPCController:
+    """
+    Wraps a CasADi NLP solver (as returned by build_mpc / build_robust_mpc)
+    into a Python controller function  u = ctrl(state).
+
+    After solving the MPC optimization problem, it extracts u₀ (first input).
+    The previous primal/dual solution is kept and passed back to IPOPT on
+    the next call (warm start) if the solve converged; otherwise the next
+    call cold-starts.  `reset()` forgets it before a new batch.
+
+    With ``event_tol`` set, the controller is event-triggered: as long as
+    the measured state stays within a relative distance ``event_tol`` of
+    the last (successful) plan's prediction, the next planned input is
+    applied without solving.  ``None`` (default) re-solves every step.
+    """
+    def __init__(
+        self,
+        solver,
+        meta: dict,
+        LBG: np.ndarray,
+        UBG: np.ndarray,
+        *,
+        event_tol: float | None = None,
+    ):
+        self.solver, self.meta, self.LBG, self.UBG = solver, meta, LBG, UBG
+        # same NLP with IPOPT's warm-start initialisation (converged guesses only)
+        self._solver_warm = meta.get("solver_warm", solver)
+        self.event_tol = event_tol
+        self.n_solves  = 0                      # NLP solves since last reset
+        self._w0       = np.empty(self.meta["nw"])  # cold-start guess buffer
+        self.reset()
+
+    def reset(self) -> None:
+        """Drop the stored solution so the next call cold-starts."""
+        self._last_sol = None
+        self._plan     = None                   # (X plan, U plan) if reusable
+        self._k_plan   = 0                      # stages consumed from the plan
+        self.n_solves  = 0
+
+    def set_cL_max(self, cL_max) -> None:
+        """
+        Change the lactose path bound (scalar or one value per stage)
+        without rebuilding the NLP – only the constraint bounds change.
+        """
+        self.UBG[self.meta["cL_path"]] = cL_max
+        self._plan = None                       # plan was for the old bound
+
+    def _shifted_guess(self, sol, steps: int = 1) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Shift a converged solution (w, λ_x, λ_g) `steps` stages forward: drop (x₀, u₀),
+        hold u_{N-1} and re-predict the last state with the discrete model.
+        Multipliers are shifted with the same stage layout.
+        """
+        meta  = self.meta
+        nX    = meta["Xslice"].stop
+        w, lam_x, lam_g = sol
+        for _ in range(steps):
+            w     = w[meta["w_shift"]]
+            w[nX - 2:nX] = meta["F"](w[nX - 2:nX], w[-1]).full().ravel()
+            lam_x = lam_x[meta["w_shift"]]
+            lam_g = lam_g[meta["g_shift"]]
+        return w, lam_x, lam_g
+
+    def _follow_plan(self, state: np.ndarray) -> bool:
+        """True if the next planned input may be applied without a solve."""
+        if self.event_tol is None or self._plan is None:
+            return False
+        X_plan, _ = self._plan
+        k = self._k_plan + 1
+        if k >= self.meta["N"]:                 # plan exhausted
+            return False
+        x_pred = X_plan[k]
+        dev = np.linalg.norm((state - x_pred) / np.maximum(np.abs(x_pred), 1e-12))
+        return dev <= self.event_tol
+
+    def __call__(self, state: np.ndarray) -> float:
+        if self._follow_plan(state):
+            self._k_plan += 1
+            return float(self._plan[1][self._k_plan])
+
+        if self._last_sol is None:
+            w0 = self._w0                                         # reused buffer
+            w0[self.meta["Xslice"]] = np.tile(state, self.meta["N"] + 1)  # states
+            w0[self.meta["Uslice"]] = self.meta["u_init"]                 # inputs
+            solver = self.solver
+            sol = solver(x0=w0, p=state, lbg=self.LBG, ubg=self.UBG)
+        else:
+            # receding horizon: shifted trajectory is near-optimal
+            x0, lam_x0, lam_g0 = self._shifted_guess(self._last_sol, self._k_plan + 1)
+            solver = self._solver_warm
+            sol = solver(
+                x0=x0, lam_x0=lam_x0, lam_g0=lam_g0,
+                p=state, lbg=self.LBG, ubg=self.UBG,
+            )
+        self.n_solves += 1
+        self._last_ok  = solver.stats()["success"]
+
+        # keep the iterate as flat NumPy vectors (converted once per solve);
+        # an unsuccessful iterate (infeasible / aborted) is a poor starting
+        # point, so the next call cold-starts instead
+        w = sol["x"].full().ravel()
+        self._last_sol = ((w, sol["lam_x"].full().ravel(), sol["lam_g"].full().ravel())
+                          if self._last_ok else None)
+        U = w[self.meta["Uslice"]]
+        # only a converged plan is worth following open-loop
+        self._plan   = (w[self.meta["Xslice"]].reshape(-1, 2), U) if self._last_ok else None
+        self._k_plan = 0
+        # return the first control action from optimized sequence
+        return float(U[0])
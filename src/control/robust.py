@@ -6,11 +6,17 @@ Helpers that build a *tube-tightened* robust MPC.
 Overview
 --------
 1. offline_tube_gain(...)   →  compute a stabilising DLQR gain  K ∈ ℝ¹×²  
-2. build_robust_mpc(...)    →  call build_mpc() then shrink lactose
-                              constraints by a worst-case tube size.
+2. tube_tightening(...)     →  worst-case tube size per prediction stage
+3. build_robust_mpc(...)    →  call build_mpc() then shrink lactose
+                              constraints by the stage-wise tube size.
+
+Both the NLP (via build_mpc) and the tube design (gain + tube size) are
+memoised, so rebuilding the same robust MPC only copies the bounds.
 """
 
 from __future__ import annotations
+from functools import lru_cache
+
 import numpy as np
 
 from core.params     import default as P_default          # nominal parameters
@@ -18,8 +24,33 @@ from core.linearise  import linearise                     # Jacobian of RHS
 from control.builder import build_mpc                     # nominal MPC
 
 # --------------------------------------------------------------------------- #
-# 0.  DLQR helper with SciPy *or* Kleinman fallback                           #
+# 0.  DLQR helper: direct eigenvector DARE, SciPy *or* Kleinman fallback      #
 # --------------------------------------------------------------------------- #
+def _solve_are_eig(A, B, Q, R):
+    """
+    Discrete algebraic Riccati equation from the stable eigenvectors
+    [U₁; U₂] of the 2n×2n symplectic matrix, P = U₂ U₁⁻¹.  For this
+    2-state plant that is one 4×4 eigenproblem (no Schur/QZ iteration).
+
+    Returns None if A is singular or the stable subspace is not
+    n-dimensional, so the caller can fall back to a general solver.
+    """
+    n = A.shape[0]
+    try:
+        Ait = np.linalg.inv(A).T
+        G   = B @ np.linalg.solve(R, B.T)
+        Z   = np.block([[A + G @ Ait @ Q, -G @ Ait],
+                        [-Ait @ Q,          Ait    ]])
+        lam, V = np.linalg.eig(Z)
+        Vs = V[:, np.abs(lam) < 1.0]                # stable subspace
+        if Vs.shape[1] != n:
+            return None
+        P = np.real(np.linalg.solve(Vs[:n].T, Vs[n:].T).T)
+    except np.linalg.LinAlgError:
+        return None
+    return 0.5 * (P + P.T) if np.all(np.isfinite(P)) else None
+
+
 def _solve_are_kleinman(A, B, Q, R, max_iter: int = 30, eps: float = 1e-12):
     """
     Tiny pure-NumPy solver for the discrete algebraic Riccati equation
@@ -36,27 +67,25 @@ def _solve_are_kleinman(A, B, Q, R, max_iter: int = 30, eps: float = 1e-12):
 
 
 try:
-    # Preferred path – use SciPy’s robust ARE solver if present
-    from scipy.linalg import solve_discrete_are, inv          # noqa: F401
+    # Fallback 1 – SciPy’s robust ARE solver if present
+    from scipy.linalg import solve_discrete_are as _solve_are
+except ModuleNotFoundError:
+    # Fallback 2 – the Kleinman routine above (pure NumPy, no SciPy)
+    _solve_are = _solve_are_kleinman
 
-    def _dlqr(A, B, Q, R):
-        """Discrete-time LQR gain via SciPy."""
-        P = solve_discrete_are(A, B, Q, R)
-        K = -inv(B.T @ P @ B + R) @ (B.T @ P @ A)
-        return K
 
-except ModuleNotFoundError:
-    # Fallback – use the Kleinman routine above (pure NumPy, no SciPy)
-    def _dlqr(A, B, Q, R):
-        """Discrete LQR gain via Kleinman iteration (SciPy unavailable)."""
-        P = _solve_are_kleinman(A, B, Q, R)
-        K = -np.linalg.solve(B.T @ P @ B + R, B.T @ P @ A)
-        return K
+def _dlqr(A, B, Q, R):
+    """Discrete-time LQR gain (direct DARE, general solver as fallback)."""
+    P = _solve_are_eig(A, B, Q, R)
+    if P is None:
+        P = _solve_are(A, B, Q, R)
+    return -np.linalg.solve(B.T @ P @ B + R, B.T @ P @ A)
 
 
 # --------------------------------------------------------------------------- #
 # 1.  One-time DLQR design for the tube feedback gain K                       #
 # --------------------------------------------------------------------------- #
+@lru_cache(maxsize=4)
 def offline_tube_gain(params=P_default, dt: float | None = None) -> np.ndarray:
     """
     Compute a stabilising state-feedback gain K (shape 1×2) at the
@@ -72,9 +101,9 @@ def offline_tube_gain(params=P_default, dt: float | None = None) -> np.ndarray:
 
     Returns
     -------
-    K : ndarray(1×2)
+    K : ndarray(1×2) – read-only; memoised per ``(params, dt)``
     """
-    dt = dt or params.dt_ctrl
+    dt = params.dt_ctrl if dt is None else dt
 
     # Linearise the *continuous* plant at (x0, u0 = 0.5)
     A, B = linearise(np.array([params.V0, params.ML0]), 0.5, params)
@@ -87,11 +116,60 @@ def offline_tube_gain(params=P_default, dt: float | None = None) -> np.ndarray:
     Q = np.diag([1e-4, 1e-4])
     R = np.array([[1.0]])
 
-    return _dlqr(Ad, Bd, Q, R)          # shape (1, 2)
+    K = _dlqr(Ad, Bd, Q, R)             # shape (1, 2)
+    K.flags.writeable = False           # shared by every cached caller
+    return K
+
+
+# --------------------------------------------------------------------------- #
+# 2.  Per-stage tube size                                                     #
+# --------------------------------------------------------------------------- #
+def tube_tightening(Acl: np.ndarray, w_max: np.ndarray, horizon: int) -> np.ndarray:
+    """
+    Worst-case error bound for every prediction stage k = 0 … N
+
+        Δx₀ = 0,    Δx_{k+1} = |Acl| · Δx_k + w_max
+
+    i.e. the partial sums of the geometric series whose limit is the
+    steady-state tube (I − |Acl|)⁻¹ w_max.  Stage 0 is the measured state
+    and needs no margin; later stages grow towards the infinite-horizon
+    bound instead of using it everywhere.
+
+    Returns
+    -------
+    ndarray(N+1, 2) – [ΔV_k, ΔML_k] per stage
+    """
+    abs_A = np.abs(Acl)
+    dx    = np.zeros((horizon + 1, len(w_max)))
+    for k in range(horizon):
+        dx[k + 1] = abs_A @ dx[k] + w_max
+    return dx
+
+
+@lru_cache(maxsize=32)
+def _tube_cached(params, horizon: int, w_max: tuple, K: tuple | None):
+    """
+    Feedback gain and per-stage tube size for one robust MPC.
+
+    Memoised on hashable arguments (frozen ``params``, tuples for
+    ``w_max`` / ``K``); the returned arrays are read-only.
+    """
+    # feedback gain K (stabilises the tube dynamics)
+    K = np.array(K).reshape(1, -1) if K is not None else offline_tube_gain(params)
+
+    # closed-loop A-matrix at the nominal linearisation point
+    A, B = linearise(np.array([params.V0, params.ML0]), 0.5, params)
+    Ad   = np.eye(2) + A * params.dt_ctrl
+    Bd   = B * params.dt_ctrl
+    Acl  = Ad + Bd @ K
+
+    tighten = tube_tightening(Acl, np.array(w_max), horizon)
+    K.flags.writeable = tighten.flags.writeable = False
+    return K, tighten
 
 
 # --------------------------------------------------------------------------- #
-# 2.  Build a robust MPC with tightened lactose constraints                   #
+# 3.  Build a robust MPC with tightened lactose constraints                   #
 # --------------------------------------------------------------------------- #
 def build_robust_mpc(
     *,
@@ -100,13 +178,17 @@ def build_robust_mpc(
     w_max: np.ndarray = np.array([1e-6, 1e-5]),  # |additive plant error|
     params = P_default,
     K: np.ndarray | None = None,
+    nominal: tuple | None = None,
+    **build_kw,
 ):
     """
     Create a *tube MPC*:
 
-        • Uses the nominal MPC from `build_mpc`.
-        • Computes a tube size Δx∞ then shrinks all lactose upper-bounds
-          so the real state (nominal + tube) never violates the original
+        • Uses the nominal MPC from `build_mpc` (cached, so the robust
+          variant shares its solver and only differs in UBG).
+        • Computes the tube size Δx_k of every prediction stage, then
+          shrinks each lactose upper-bound by its own stage margin so the
+          real state (nominal + tube) never violates the original
           constraints.
 
     Parameters
@@ -120,51 +202,58 @@ def build_robust_mpc(
     params : ProcessParams
     K : ndarray(1×2), optional
         Pre-computed feedback gain.  If None we design it on the fly.
+    nominal : tuple, optional
+        A ``(solver, meta, LBG, UBG)`` tuple from `build_mpc` to tighten
+        instead of building one (it is not modified).  `horizon`,
+        `base_mode` and `build_kw` are then ignored.
+    **build_kw
+        Passed on to `build_mpc` (e.g. ``solver``, ``codegen``, ``jit``).
 
     Returns
     -------
     solver : casadi.nlpsol
-    meta   : dict (contains feedback gain and tube size)
+    meta   : dict (contains feedback gain and per-stage tube size)
     LBG    : ndarray – lower bounds
     UBG    : ndarray – *tightened* upper bounds
     """
-    # 1 ───────────────── feedback gain K (stabilises the tube dynamics)
-    K = K if K is not None else offline_tube_gain(params)
+    # 1 ───────────────── build the *nominal* MPC first (or reuse one)
+    if nominal is None:
+        solver, meta, LBG, UBG = build_mpc(
+            mode    = base_mode,
+            horizon = horizon,
+            params  = params,
+            **build_kw,
+        )
+    else:
+        solver, meta, LBG, UBG = nominal
+        meta, LBG, UBG = dict(meta), LBG.copy(), UBG.copy()
+        horizon = meta["N"]
 
-    # 2 ───────────────── worst-case tube size  Δx∞  via geometric series
-    A, B = linearise(np.array([params.V0, params.ML0]), 0.5, params)
-    Ad   = np.eye(2) + A * params.dt_ctrl
-    Bd   = B * params.dt_ctrl
-    Acl  = Ad + Bd @ K                               # closed-loop A-matrix
-
-    # Ω = (I − |Acl|)⁻¹   ⇒  Δx∞ = Ω · w_max     (∞-norm bound)
-    Om       = np.linalg.inv(np.eye(2) - np.abs(Acl))
-    tighten  = np.abs(Om) @ w_max                  # [ΔV, ΔML]
-
-    # 3 ───────────────── build the *nominal* MPC first
-    solver, meta, LBG, UBG = build_mpc(
-        mode    = base_mode,
-        horizon = horizon,
-        params  = params,
-    )
+    # 2+3 ─────────────── feedback gain K and worst-case tube size Δx_k
+    #                      for k = 0 … N  (memoised per design)
+    K, tighten = _tube_cached(
+        params, horizon,
+        tuple(np.ravel(w_max).tolist()),
+        None if K is None else tuple(np.ravel(K).tolist()),
+    )                                                # (N+1) × [ΔV, ΔML]
 
     # 4 ───────────────── tighten every lactose constraint
-    tighten_cL = tighten[1] / params.V0                # convert ΔML → ΔcL
+    tighten_cL = tighten[:, 1] / params.V0             # convert ΔML → ΔcL
 
-    # Path constraints: element in UBG equals params.cL_max
-    is_lactose = np.isclose(UBG, params.cL_max)
+    # Path constraints: one cL ≤ cL_max row per stage k = 0 … N−1
+    is_lactose = meta["cL_path"]
 
-    # Shrink: new_UB  = max(LB + ε,  UB − Δ)
+    # Shrink: new_UB  = max(LB + ε,  UB − Δ_k)
     UBG[is_lactose] = np.maximum(
         LBG[is_lactose] + 1e-9,
-        UBG[is_lactose] - tighten_cL,
+        UBG[is_lactose] - tighten_cL[:len(is_lactose)],
     )
 
-    # Terminal lactose spec is the *last* element of g
-    UBG[-1] = max(LBG[-1] + 1e-9, UBG[-1] - tighten_cL)
+    # Terminal lactose spec is the *last* element of g (stage N)
+    UBG[-1] = max(LBG[-1] + 1e-9, UBG[-1] - tighten_cL[-1])
 
     # Package extra info for diagnostics
-    meta["K"]       = K
-    meta["tighten"] = tighten
+    meta["K"]       = K.copy()
+    meta["tighten"] = tighten.copy()
 
     return solver, meta, LBG, UBG
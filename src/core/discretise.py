@@ -4,18 +4,26 @@ core/discretise.py
 Utility functions that turn a *continuous* RHS  ẋ = f(x,u)
 into explicit Runge–Kutta-4 (RK4) *discrete-time* maps.
 
-Two flavours are provided
+Three flavours are provided
 
-1. rk4_disc  – returns a **CasADi** Function  F(x,u) = x⁺  (used inside MPC)
-2. rk4_step  – performs one **NumPy** RK4 step          (used for simulation)
+1. rk4_disc         – returns a **CasADi** Function  F(x,u) = x⁺  (used inside MPC);
+                      rk4_model(params, dt) is the cached nominal-model version
+2. rk4_step         – performs one **NumPy** RK4 step          (used for simulation)
+3. rk4_step_scalar  – the same step on plain floats (Numba-compiled if available);
+                      rk4_step_batch advances B nominal trajectories at once
 """
 
 from __future__ import annotations
+from functools import lru_cache
 from typing import Callable
 
 import casadi as ca
 import numpy as np
 
+from core.dynamics import casadi_rhs, rhs_scalar
+from core.jit      import njit
+from core.params   import default as P_default
+
 
 # ════════════════════════════════════════════════════════════════════════════
 # 1.  CasADi RK4 map  (symbolic – for MPC optimiser)                          #
@@ -52,7 +60,17 @@ def rk4_disc(rhs_fun: ca.Function, dt: float) -> ca.Function:
     # weighted average → next state
     x_next = x + dt / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
 
-    return ca.Function("F", [x, u], [x_next])
+    # SX calls above are inlined; let CasADi merge repeated subexpressions
+    return ca.Function("F", [x, u], [x_next], {"cse": True})
+
+
+@lru_cache(maxsize=None)
+def rk4_model(params, dt: float) -> ca.Function:
+    """
+    RK4 map of the nominal model, built once per (params, dt) and shared
+    by every MPC horizon that uses it.
+    """
+    return rk4_disc(casadi_rhs(params), dt)
 
 
 # ════════════════════════════════════════════════════════════════════════════
@@ -62,7 +80,8 @@ def rk4_step(
     state: np.ndarray,
     u: float,
     dt: float,
-    rhs: Callable[[np.ndarray, float], np.ndarray],
+    rhs: Callable[..., np.ndarray],
+    *args,
 ) -> np.ndarray:
     """
     Perform **one** explicit RK4 step for a NumPy simulation loop.
@@ -76,16 +95,65 @@ def rk4_step(
     dt : float
         Integration step size.
     rhs : callable
-        Python function implementing  ẋ = f(x,u).
+        Python function implementing  ẋ = f(x,u,*args).
+    *args
+        Extra arguments passed on to every rhs call (e.g. the time t), so
+        callers need no per-step closure.
 
     Returns
     -------
     ndarray
         Next state  x⁺  after a single RK4 step.
     """
-    k1 = rhs(state,                 u)
-    k2 = rhs(state + 0.5 * dt * k1, u)
-    k3 = rhs(state + 0.5 * dt * k2, u)
-    k4 = rhs(state +       dt * k3, u)
+    k1 = rhs(state,                 u, *args)
+    k2 = rhs(state + 0.5 * dt * k1, u, *args)
+    k3 = rhs(state + 0.5 * dt * k2, u, *args)
+    k4 = rhs(state +       dt * k3, u, *args)
 
     return state + dt / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+
+
+# ════════════════════════════════════════════════════════════════════════════
+# 3.  Scalar RK4 step  (compiled – for open-loop simulation kernels)          #
+# ════════════════════════════════════════════════════════════════════════════
+@njit
+def rk4_step_scalar(V, ML, u, dt, MP, k, A, cg, kM_L, alpha):
+    """
+    One RK4 step of the nominal model on plain floats.
+
+    Mirrors `rk4_step(state, u, dt, rhs)` operation for operation so the
+    compiled path reproduces the NumPy trajectory.
+
+    Returns
+    -------
+    (V⁺, ML⁺) : tuple of float
+    """
+    k1V, k1M = rhs_scalar(V,                 ML,                 u, MP, k, A, cg, kM_L, alpha)
+    k2V, k2M = rhs_scalar(V + 0.5 * dt * k1V, ML + 0.5 * dt * k1M, u, MP, k, A, cg, kM_L, alpha)
+    k3V, k3M = rhs_scalar(V + 0.5 * dt * k2V, ML + 0.5 * dt * k2M, u, MP, k, A, cg, kM_L, alpha)
+    k4V, k4M = rhs_scalar(V +       dt * k3V, ML +       dt * k3M, u, MP, k, A, cg, kM_L, alpha)
+
+    return (V  + dt / 6 * (k1V + 2 * k2V + 2 * k3V + k4V),
+            ML + dt / 6 * (k1M + 2 * k2M + 2 * k3M + k4M))
+
+
+def rk4_step_batch(states: np.ndarray, u, dt: float, params=P_default) -> np.ndarray:
+    """
+    One nominal RK4 step for B trajectories at once.
+
+    Parameters
+    ----------
+    states : ndarray(B, 2)
+        Current states [V, ML], one row per trajectory.
+    u : float or ndarray(B,)
+        Shared or per-trajectory input.
+    dt : float
+        Integration step size.
+    params : ProcessParams
+
+    Returns
+    -------
+    ndarray(B, 2) – next states
+    """
+    V, ML = rk4_step_scalar(states[:, 0], states[:, 1], u, dt, *params.model_args())
+    return np.stack((V, ML), axis=1)
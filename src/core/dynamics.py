@@ -10,18 +10,36 @@ Continuous-time diafiltration model with 2 states:
 Also includes:
 - Permeate flux model (based on protein concentration)
 - Lactose concentration in the permeate
+- Scalar (optionally Numba-compiled) kernels behind the NumPy functions,
+  also used directly by tight simulation loops
 """
 
 from __future__ import annotations
+from functools import lru_cache
+
 import numpy as np
 import casadi as ca
 from core.params import default as P
+from core.jit    import njit
 
 
 # ════════════════════════════════════════════════════════════════════════════
 # 1. Auxiliary flux functions (used by the dynamics)                          #
 # ════════════════════════════════════════════════════════════════════════════
 
+# scalar cores on plain floats (Numba-compiled if available); the public
+# helpers below unpack ProcessParams for them
+@njit
+def _flux_kernel(cP, k, A, cg):
+    return k * A * np.log(cg / cP)
+
+
+@njit
+def _lactose_perm_kernel(cL, p, kM_L, A, alpha):
+    exp_term = np.exp(p / (kM_L * A))
+    return alpha * cL / (1 + (alpha - 1) * exp_term)
+
+
 def flux_permeate(cP: float, P=P) -> float:
     """
     Permeate mass flux [kg/s] as a function of protein concentration.
@@ -36,7 +54,7 @@ def flux_permeate(cP: float, P=P) -> float:
     float
         Permeate mass flux
     """
-    return P.k * P.A * np.log(P.cg / cP)
+    return _flux_kernel(cP, P.k, P.A, P.cg)
 
 
 def lactose_permeate_conc(cL: float, p: float, P=P) -> float:
@@ -55,8 +73,7 @@ def lactose_permeate_conc(cL: float, p: float, P=P) -> float:
     float
         Lactose concentration in permeate
     """
-    exp_term = np.exp(p / (P.kM_L * P.A))
-    return P.alpha * cL / (1 + (P.alpha - 1) * exp_term)
+    return _lactose_perm_kernel(cL, p, P.kM_L, P.A, P.alpha)
 
 
 # ════════════════════════════════════════════════════════════════════════════
@@ -80,29 +97,21 @@ def rhs(state: np.ndarray, u: float, P=P) -> np.ndarray:
         Derivative [dV/dt, dML/dt]
     """
     V, ML = state
-    V = max(V, 1e-6)                      # avoid divide-by-zero errors
-
-    cP = P.MP / V                         # protein concentration
-    p  = flux_permeate(cP, P)            # total permeate flux
-    d  = u * p                            # dilution inflow
-    cL = ML / V                           # lactose concentration in retentate
-    cL_p = lactose_permeate_conc(cL, p, P)  # lactose concentration in permeate
-
-    return np.asarray([
-        d - p,                           # dV/dt: net volume change
-        -cL_p * p                        # dML/dt: lactose loss through membrane
-    ])
+    # same model as the compiled scalar kernel below (section 4)
+    return np.array(rhs_scalar(V, ML, u, *P.model_args()))
 
 
 # ════════════════════════════════════════════════════════════════════════════
 # 3. CasADi version of RHS for use in MPC (symbolic)                          #
 # ════════════════════════════════════════════════════════════════════════════
 
+@lru_cache(maxsize=8)
 def casadi_rhs(P=P) -> ca.Function:
     """
     Create a CasADi function: f(x,u) = ẋ
 
     This is used by MPC and numeric integrators for symbolic modelling.
+    Built once per (hashable, frozen) parameter set and shared.
 
     Returns
     -------
@@ -112,16 +121,21 @@ def casadi_rhs(P=P) -> ca.Function:
     x = ca.SX.sym("x", 2)     # [V, ML]
     u = ca.SX.sym("u")        # valve input
 
+    # constants folded to single literals before building the graph
+    kA       = P.k * P.A                  # flux prefactor
+    cg_MP    = P.cg / P.MP                # cg / cP = (cg / MP) · V
+    inv_kMLA = 1.0 / (P.kM_L * P.A)
+    am1      = P.alpha - 1.0
+
     V, ML = x[0], x[1]
     V_safe = ca.fmax(V, 1e-6)       # ensure stability
 
-    cP = P.MP / V_safe              # protein concentration
-    p  = P.k * P.A * ca.log(P.cg / cP)  # flux expression
+    p  = kA * ca.log(cg_MP * V_safe)      # flux expression  (cP = MP / V)
     d  = u * p                      # dilution inflow
 
     cL = ML / V_safe
-    exp_term = ca.exp(p / (P.kM_L * P.A))
-    cL_p = P.alpha * cL / (1 + (P.alpha - 1) * exp_term)
+    exp_term = ca.exp(p * inv_kMLA)
+    cL_p = P.alpha * cL / (1 + am1 * exp_term)
 
     dxdt = ca.vertcat(
         d - p,                      # dV/dt
@@ -129,3 +143,32 @@ def casadi_rhs(P=P) -> ca.Function:
     )
 
     return ca.Function("rhs", [x, u], [dxdt])
+
+
+# ════════════════════════════════════════════════════════════════════════════
+# 4. Scalar RHS kernel for compiled simulation loops                          #
+# ════════════════════════════════════════════════════════════════════════════
+
+@njit
+def rhs_scalar(V, ML, u, MP, k, A, cg, kM_L, alpha):
+    """
+    Same model as `rhs`, written on plain floats so Numba can compile it.
+
+    Parameters are passed explicitly (MP, k, A, cg, kM_L, alpha) because
+    the kernel cannot read a ProcessParams instance.  All arithmetic is
+    elementwise, so equally shaped arrays (one entry per trajectory or
+    parameter draw) evaluate a whole batch in one call.
+
+    Returns
+    -------
+    (dV/dt, dML/dt) : tuple of float (or of arrays in batch mode)
+    """
+    V = np.maximum(V, 1e-6)               # avoid divide-by-zero errors
+
+    cP = MP / V                           # protein concentration
+    p  = _flux_kernel(cP, k, A, cg)       # total permeate flux
+    d  = u * p                            # dilution inflow
+    cL = ML / V                           # lactose concentration in retentate
+    cL_p = _lactose_perm_kernel(cL, p, kM_L, A, alpha)  # lactose in permeate
+
+    return d - p, -cL_p * p               # dV/dt, dML/dt
@@ -0,0 +1,34 @@
+"""
+core/jit.py
+───────────
+Optional Numba acceleration for the scalar simulation kernels.
+
+`njit` is ``numba.njit`` when Numba is installed.  Otherwise it is a
+no-op decorator, so the decorated kernels still run as plain Python
+(same results, just without the speed-up).
+"""
+
+from __future__ import annotations
+
+try:
+    # Preferred path – compile to native code (cached on disk)
+    from numba import njit as _numba_njit
+
+    HAVE_NUMBA = True
+
+    def njit(fn=None, **kwargs):
+        """``numba.njit`` with on-disk caching enabled by default."""
+        kwargs.setdefault("cache", True)
+        if fn is None:
+            return _numba_njit(**kwargs)
+        return _numba_njit(**kwargs)(fn)
+
+except ModuleNotFoundError:
+    # Fallback – leave the function untouched
+    HAVE_NUMBA = False
+
+    def njit(fn=None, **kwargs):
+        """No-op stand-in used when Numba is not installed."""
+        if fn is None:
+            return lambda f: f
+        return fn
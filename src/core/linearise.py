@@ -1,19 +1,31 @@
 """
 core/linearise.py
 ─────────────────────
-Compute continuous-time Jacobian matrices A, B at a given operating point (x*, u*).
+Compute continuous-time Jacobian matrices A, B at a given operating point (x*, u*);
+linearise_traj does the same for every point of a trajectory in one call.
 
 These matrices are used for:
 - Linear model approximations
 - Tube-based robust MPC (e.g. DLQR feedback)
 """
 
+from functools import lru_cache
+
 import casadi as ca
 import numpy  as np
 from core.params   import ProcessParams
 from core.dynamics import casadi_rhs
 
 
+@lru_cache(maxsize=8)
+def _jacobian_fns(P: ProcessParams) -> ca.Function:
+    """
+    Jacobians of the cached model f(x,u) as one Function (x,u) → (A, B),
+    derived from f itself (no second symbolic pass), built once per P.
+    """
+    return casadi_rhs(P).factory("AB", ["i0", "i1"], ["jac:o0:i0", "jac:o0:i1"])
+
+
 def linearise(x_star: np.ndarray,
               u_star: float,
               P: ProcessParams):
@@ -36,24 +48,44 @@ def linearise(x_star: np.ndarray,
     B : ndarray
         Jacobian ∂f/∂u evaluated at (x*, u*) – shape (2×1)
     """
+    # Evaluate the cached Jacobian function numerically at (x*, u*)
+    A_val, B_val = _jacobian_fns(P)(x_star, u_star)
+
+    return A_val.full(), B_val.full().reshape(2, 1)
 
-    # Define symbolic variables
-    x = ca.SX.sym("x", 2)   # state vector [V, ML]
-    u = ca.SX.sym("u")      # input: dilution valve
 
-    # Get symbolic RHS function f(x,u)
-    f = casadi_rhs(P)
+@lru_cache(maxsize=8)
+def _jacobian_map(P: ProcessParams, n: int) -> ca.Function:
+    """`_jacobian_fns(P)` mapped over n operating points, built once per (P, n)."""
+    return _jacobian_fns(P).map(n)
 
-    # Compute symbolic Jacobians
-    A = ca.jacobian(f(x, u), x)   # partial derivative w.r.t. x
-    B = ca.jacobian(f(x, u), u)   # partial derivative w.r.t. u
 
-    # Turn into callable functions
-    A_f = ca.Function('A', [x, u], [A])
-    B_f = ca.Function('B', [x, u], [B])
+def linearise_traj(X_star: np.ndarray,
+                   U_star: np.ndarray,
+                   P: ProcessParams):
+    """
+    Jacobians A_k, B_k at every point of a trajectory in one call.
+
+    Parameters
+    ----------
+    X_star : ndarray(2, n)
+        Operating-point states [V, ML], one per column.
+    U_star : ndarray(n,)
+        Operating-point inputs.
+    P : ProcessParams
+
+    Returns
+    -------
+    A : ndarray(n, 2, 2) – A[k] = ∂f/∂x at (x*_k, u*_k)
+    B : ndarray(n, 2, 1) – B[k] = ∂f/∂u at (x*_k, u*_k)
+    """
+    X_star = np.asarray(X_star, dtype=float).reshape(2, -1)
+    n      = X_star.shape[1]
+    U_star = np.broadcast_to(np.asarray(U_star, dtype=float).ravel(), (n,))
 
-    # Evaluate numerically at operating point (x*, u*)
-    A_val = np.array(A_f(x_star, u_star))
-    B_val = np.array(B_f(x_star, u_star)).reshape(2, 1)
+    # mapped outputs are concatenated column-wise: A → (2, 2n), B → (2, n)
+    A_val, B_val = _jacobian_map(P, n)(X_star, U_star.reshape(1, n))
 
-    return A_val, B_val
+    A = A_val.full().reshape(2, n, 2).transpose(1, 0, 2)
+    B = B_val.full().T.reshape(n, 2, 1)
+    return A, B
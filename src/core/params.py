@@ -7,7 +7,7 @@ These are used throughout the simulation and MPC codebase via a single
 immutable instance: `default = ProcessParams()`.
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 @dataclass(frozen=True)
 class ProcessParams:
@@ -34,22 +34,30 @@ class ProcessParams:
     dt_ctrl: float = 600.0    # Control interval (sampling time) [s]
     t_final: float = 6 * 3600 # Total simulation time = 6 hours [s]
 
-    # ── Derived parameters (automatically computed) ────────────────────
-    @property
-    def MP(self) -> float:
-        """
-        Total mass of protein in the tank [kg], assumed constant.
-        MP = cP0 × V0
-        """
-        return self.cP0 * self.V0
+    # ── Derived parameters (computed once in __post_init__) ────────────
+    #   MP  – total mass of protein in the tank [kg], assumed constant
+    #         MP  = cP0 × V0
+    #   ML0 – initial total mass of lactose [kg]
+    #         ML0 = cL0 × V0
+    #   Plain fields instead of properties: read on every simulation step,
+    #   and kept consistent by dataclasses.replace() (which re-runs
+    #   __post_init__).
+    MP:  float = field(init=False, repr=False)
+    ML0: float = field(init=False, repr=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "MP",  self.cP0 * self.V0)
+        object.__setattr__(self, "ML0", self.cL0 * self.V0)
 
-    @property
-    def ML0(self) -> float:
+    # ── Plain-float views for compiled kernels ─────────────────────────
+    def model_args(self) -> tuple[float, ...]:
         """
-        Initial total mass of lactose [kg].
-        ML0 = cL0 × V0
+        Model constants as a flat tuple (MP, k, A, cg, kM_L, alpha) –
+        the trailing arguments of core.dynamics.rhs_scalar and
+        core.discretise.rk4_step_scalar.  Numba kernels cannot take the
+        dataclass itself, so callers unpack this instead.
         """
-        return self.cL0 * self.V0
+        return (self.MP, self.k, self.A, self.cg, self.kM_L, self.alpha)
 
 
 # A default instance shared across all modules unless explicitly overridden.
@@ -11,6 +11,8 @@ Day-ahead spot-market electricity tariff for energy-aware MPC.
 from __future__ import annotations
 import numpy as np
 
+from core.jit import njit
+
 # 24-hour profile, EUR **per kWh**  (≈ 80–370 EUR/MWh)
 #             0h  1h  2h  3h  4h  5h  6h  7h  8h  9h 10h 11h
 _PRICE = np.array([0.09, 0.08, 0.08, 0.09, 0.10, 0.12,
@@ -19,6 +21,12 @@ _PRICE = np.array([0.09, 0.08, 0.08, 0.09, 0.10, 0.12,
                    0.37, 0.34, 0.30, 0.26, 0.23, 0.20,
                    0.18, 0.16, 0.14, 0.12, 0.10, 0.09])
 
+# piecewise-linear LUT: price at the start of each hour and slope to the
+# next hour (the last slope wraps to 0 h, so no second modulo is needed)
+_INTER = _PRICE.copy()
+_SLOPE = np.diff(np.r_[_PRICE, _PRICE[0]])
+
+@njit
 def lambda_tou(t_sec: float) -> float:             # ← same name, same units
     """
     Continuous €/kWh tariff from a typical day-ahead spot curve.
@@ -33,10 +41,17 @@ def lambda_tou(t_sec: float) -> float:             # ← same name, same units
     * For batches that run > 24 h we *wrap around* the profile.
     * Hour-to-hour prices are **linearly interpolated** to avoid jumps
       that could confuse gradient-based solvers in economic MPC.
+    * Numba-compiled when available (the LUT arrays are frozen in as
+      constants), so it can also be called from other compiled kernels.
     """
     # convert to fractional hour in [0, 24)
-    h = (t_sec / 3600.0) % 24.0
-    i = int(np.floor(h))            # index of the “left” hour
-    j = (i + 1) % 24                # index of the “right” hour (wrap)
-    θ = h - i                       # linear blend factor
-    return float((1.0 - θ) * _PRICE[i] + θ * _PRICE[j])
\ No newline at end of file
+    h = (t_sec * (1.0 / 3600.0)) % 24.0
+    i = int(h)                      # index of the “left” hour (h ≥ 0)
+    return float(_INTER[i] + _SLOPE[i] * (h - i))
+
+
+def lambda_tou_vec(t_sec: np.ndarray) -> np.ndarray:
+    """`lambda_tou` for an array of times (e.g. a whole MPC horizon)."""
+    h = (np.asarray(t_sec, dtype=float) * (1.0 / 3600.0)) % 24.0
+    i = h.astype(np.intp)
+    return _INTER[i] + _SLOPE[i] * (h - i)
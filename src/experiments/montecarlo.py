@@ -8,18 +8,25 @@ of the plant with uncertain parameters.
 
 Includes:
     - sample_random_params() : generates perturbed ProcessParams
+    - sample_random_params_batch() : many perturbed ProcessParams at once
+                               from a seeded NumPy generator
     - run()                  : simulates many runs and returns batch time,
                                peak lactose concentration, and success flag
+                               (constant-u / threshold policies run as one batch,
+                               others optionally in worker processes)
 """
 
 from __future__ import annotations
+import os
 import numpy as np
 import random
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import replace, asdict
 from typing import Callable
 
 from core.params import ProcessParams, default as P_default
 from sim         import simulate, Nominal  # Reuse the nominal scenario and simulator
+from sim.simulate import simulate_const_u_batch, simulate_threshold_batch
 
 
 # ────────────────────────────────────────────────
@@ -50,16 +57,58 @@ def sample_random_params(P: ProcessParams = P_default) -> ProcessParams:
     )
 
 
+def sample_random_params_batch(
+    num_runs: int,
+    P: ProcessParams = P_default,
+    seed: int | np.random.Generator | None = None,
+) -> list[ProcessParams]:
+    """
+    `num_runs` perturbed parameter sets with the same distributions as
+    `sample_random_params`, drawn as three vectors from
+    ``np.random.default_rng(seed)`` – reproducible for a fixed seed.
+    """
+    rng = np.random.default_rng(seed)
+    kM_L = P.kM_L * rng.uniform(0.25, 1.0, num_runs)
+    k    = P.k    * rng.uniform(0.80, 1.20, num_runs)
+    A    = P.A    * rng.uniform(0.80, 1.20, num_runs)
+    return [replace(P, kM_L=float(a), k=float(b), A=float(c))
+            for a, b, c in zip(kM_L, k, A)]
+
+
 # ────────────────────────────────────────────────
 # ❷ Monte-Carlo simulation driver
 # ────────────────────────────────────────────────
 
+def _run_chunk(ctrl_fun: Callable[[np.ndarray], float], P_list: list, tol: float):
+    """Closed-loop runs for the given plants (one process, one controller)."""
+    times_h, peaks_cL, success = [], [], []
+    for P_rand in P_list:
+        # 1. Simulate using the provided controller
+        scen = Nominal(P_rand)
+        t, V, ML, _ = simulate(ctrl_fun, scen)
+
+        # 2. Convert to concentrations
+        cP = P_rand.MP / V
+        cL = ML / V
+
+        # 3. Check if final concentrations meet specs
+        fin = (cP[-1] >= P_rand.cP_star - tol) and (cL[-1] <= P_rand.cL_star + tol)
+
+        # 4. Record results
+        times_h.append(t[-1] / 3600)            # total batch time in hours
+        peaks_cL.append(float(np.max(cL)))      # max lactose concentration during batch
+        success.append(bool(fin))               # did it meet the spec?
+    return times_h, peaks_cL, success
+
+
 def run(
     num_runs : int,
     ctrl_fun : Callable[[np.ndarray], float],
     *,
     sampler  : Callable[[ProcessParams], ProcessParams] = sample_random_params,
     P        : ProcessParams = P_default,
+    n_jobs   : int | None = 1,
+    seed     : int | None = None,
 ):
     """
     Runs `num_runs` simulations of the plant with randomly sampled parameters,
@@ -74,6 +123,15 @@ def run(
             Function that returns a randomly perturbed ProcessParams.
         P : ProcessParams
             The base (unperturbed) process parameters.
+        n_jobs : int or None
+            Worker processes for the closed-loop runs (None → all CPUs).
+            Each worker gets its own copy of `ctrl_fun` (it must be
+            picklable, e.g. the MPC presets); results are identical to
+            n_jobs=1 since all plants are sampled up front.
+        seed : int or None
+            With the default sampler, draw all plants at once via
+            `sample_random_params_batch(num_runs, P, seed)` (reproducible).
+            Otherwise `sampler` is called once per run.
 
     Returns:
         times_h   : list of batch durations [hours]
@@ -82,25 +140,43 @@ def run(
     """
     times_h, peaks_cL, success = [], [], []
     tol = 1e-3  # Small tolerance to allow for floating point errors
-
-    for _ in range(num_runs):
-        # 1. Generate a new plant model
-        P_rand = sampler(P)
-
-        # 2. Simulate using the provided controller
-        scen = Nominal(P_rand)
-        t, V, ML, _ = simulate(ctrl_fun, scen)
-
-        # 3. Convert to concentrations
-        cP = P_rand.MP / V
-        cL = ML / V
-
-        # 4. Check if final concentrations meet specs
-        fin = (cP[-1] >= P_rand.cP_star - tol) and (cL[-1] <= P_rand.cL_star + tol)
-
-        # 5. Record results
-        times_h.append(t[-1] / 3600)            # total batch time in hours
-        peaks_cL.append(float(np.max(cL)))      # max lactose concentration during batch
-        success.append(bool(fin))               # did it meet the spec?
-
+    if num_runs <= 0:
+        return times_h, peaks_cL, success
+
+    # all plants are drawn up front (same order for every execution path)
+    if seed is not None and sampler is sample_random_params:
+        P_all = sample_random_params_batch(num_runs, P, seed)
+    else:
+        P_all = [sampler(P) for _ in range(num_runs)]
+
+    # Constant-input / threshold policies: integrate all plants together
+    u_const = getattr(ctrl_fun, "u_const", None)
+    rule    = getattr(ctrl_fun, "threshold_rule", None)
+    if u_const is not None or rule is not None:
+        t, V, ML, n = (simulate_const_u_batch(u_const, P_all) if u_const is not None
+                       else simulate_threshold_batch(rule, P_all))
+        for j, P_rand in enumerate(P_all):
+            cP = P_rand.MP / V[:n[j], j]
+            cL = ML[:n[j], j] / V[:n[j], j]
+            fin = (cP[-1] >= P_rand.cP_star - tol) and (cL[-1] <= P_rand.cL_star + tol)
+            times_h.append(t[n[j] - 1] / 3600)
+            peaks_cL.append(float(np.max(cL)))
+            success.append(bool(fin))
+        return times_h, peaks_cL, success
+
+    # Closed-loop policies: split the plants into one chunk per worker
+    n_jobs = min(num_runs, n_jobs or os.cpu_count() or 1)
+    if n_jobs <= 1:
+        return _run_chunk(ctrl_fun, P_all, tol)
+
+    chunks = [P_all[i::n_jobs] for i in range(n_jobs)]
+    with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+        parts = list(pool.map(_run_chunk, [ctrl_fun] * n_jobs, chunks, [tol] * n_jobs))
+
+    # undo the round-robin split so results follow the sampling order
+    for j in range(num_runs):
+        res = parts[j % n_jobs]
+        times_h.append(res[0][j // n_jobs])
+        peaks_cL.append(res[1][j // n_jobs])
+        success.append(res[2][j // n_jobs])
     return times_h, peaks_cL, success
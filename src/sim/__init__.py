@@ -7,6 +7,10 @@ This makes key functions and classes from the submodules available at package le
 
 Exposes:
     - simulate         : main simulation engine
+    - simulate_const_u_batch : constant-u runs for many parameter sets at once
+    - simulate_threshold_batch : threshold-policy runs for many parameter sets at once
+    - open_loop_batch  : open-loop trajectories for many initial states at once
+    - run_batch        : closed-loop runs of many scenarios in worker processes
     - constant_u       : open-loop controller with constant valve opening
     - threshold_policy : basic feedback controller using a rule-based threshold
     - mpc_spec         : MPC that tracks specs (cP*, cL*) using quadratic costs
@@ -21,6 +25,9 @@ Exposes:
 # Import controllers and the simulation loop
 from .simulate import (
     simulate,
+    simulate_const_u_batch,
+    simulate_threshold_batch,
+    open_loop_batch,
     constant_u,
     threshold_policy,
     mpc_spec,
@@ -28,6 +35,9 @@ from .simulate import (
     mpc_econ,
 )
 
+# Process-parallel scenario sweeps
+from .batch import run_batch
+
 # Import predefined plant model variations (used for robustness tests)
 from .scenarios import (
     Nominal,
@@ -0,0 +1,79 @@
+"""
+sim/batch.py
+
+Scenario sweeps in worker processes
+───────────────────────────────────
+Closed-loop runs of different scenarios are independent, so they can be
+spread over processes (IPOPT itself is single-threaded).
+
+Each worker builds its *own* controller once, from a picklable factory
+(e.g. ``functools.partial(mpc_spec, 20)``), and reuses it for every
+scenario it is handed; `simulate` resets stateful controllers per run.
+
+Includes:
+    - run_batch() : simulate(controller, scenario) for many scenarios
+"""
+
+from __future__ import annotations
+import copy
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Sequence
+
+from sim.scenarios import Scenario
+from sim.simulate  import simulate
+
+# controller of the current worker process (set by _init_worker)
+_worker_ctrl = None
+
+
+def _init_worker(controller_factory: Callable[[], Callable]) -> None:
+    """Build the worker's controller once, when the process starts."""
+    global _worker_ctrl
+    _worker_ctrl = controller_factory()
+
+
+def _run_one(scenario: Scenario, tf: float | None, dt: float | None):
+    """One closed-loop run with the worker's controller."""
+    return simulate(_worker_ctrl, scenario, tf, dt)
+
+
+def run_batch(
+    scenarios: Sequence[Scenario],
+    controller_factory: Callable[[], Callable],
+    *,
+    max_workers: int | None = None,
+    tf: float | None = None,
+    dt: float | None = None,
+) -> list:
+    """
+    Simulate every scenario with a controller from `controller_factory`.
+
+    Parameters
+    ----------
+    scenarios : sequence of Scenario
+        Plants to simulate.  Each run gets a copy (pickled to a worker or
+        deep-copied in-process), so stateful scenarios such as
+        ProteinLeakage are not modified in the caller.
+    controller_factory : callable
+        Zero-argument, picklable function returning a controller.
+    max_workers : int, optional
+        Worker processes (default: number of CPUs).  With one worker the
+        runs happen in this process.
+    tf, dt : float, optional
+        Forwarded to `simulate`.
+
+    Returns
+    -------
+    list of (t, V, ML, u_hist) – one `simulate` result per scenario, in order
+    """
+    scenarios = list(scenarios)
+    workers = min(len(scenarios), max_workers or os.cpu_count() or 1)
+    if workers <= 1:
+        ctrl = controller_factory()
+        return [simulate(ctrl, copy.deepcopy(sc), tf, dt) for sc in scenarios]
+
+    n = len(scenarios)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(controller_factory,)) as pool:
+        return list(pool.map(_run_one, scenarios, [tf] * n, [dt] * n))
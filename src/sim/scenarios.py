@@ -5,16 +5,20 @@ Scenario classes – each supplies a continuous-time RHS f(x, u, t).
 
 The base class `Scenario` wraps around a process model (`ProcessParams`) and
 its continuous dynamics. Subclasses override `rhs()` to introduce specific
-plant deviations such as damage, parameter mismatch, or leakage.
+plant deviations such as damage, parameter mismatch, or leakage.  Plants
+with hidden states (e.g. the leaked protein mass) also override `step()`
+and `reset()`.
 
 Used for robustness testing, Monte-Carlo simulation, and controller validation.
 """
 
 from __future__ import annotations
 from dataclasses import replace
+import math
 import numpy as np
 
 from core.params import ProcessParams, default as P_default
+from core.discretise import rk4_step
 from core.dynamics import (
     rhs as rhs_nom,                    # nominal dynamics function (NumPy version)
     flux_permeate,                    # helper: protein flux through membrane
@@ -54,6 +58,13 @@ class Scenario:
         """
         return rhs_nom(x, u, self.P)
 
+    def step(self, x: np.ndarray, u: float, t: float, dt: float) -> np.ndarray:
+        """One RK4 step of `rhs` from time t; returns the next [V, ML]."""
+        return rk4_step(x, u, dt, self.rhs, t)
+
+    def reset(self) -> None:
+        """Restore internal plant states before a new batch (none here)."""
+
     def specs_met(self, x: np.ndarray) -> bool:
         """
         Check whether the final product meets purity and lactose specs.
@@ -138,7 +149,9 @@ class ProteinLeakage(Scenario):
     kM_P : float
         Protein mass-transfer coefficient (default 1e-6 m/s)
     MP_cur : float
-        Internally tracked total protein mass (decreases over time)
+        Total protein mass in the tank (decreases over time).  It is a
+        third plant state, integrated together with [V, ML] in `step`;
+        `reset` restores it to params.MP.
     """
 
     def __init__(
@@ -153,6 +166,10 @@ class ProteinLeakage(Scenario):
         self.kM_P = kM_P
         self.MP_cur = params.MP  # current (dynamic) protein mass in tank
 
+    def reset(self) -> None:
+        """Refill the protein mass for a new batch."""
+        self.MP_cur = self.P.MP
+
     def specs_met(self, x: np.ndarray) -> bool:
         """
         Override spec check to use current (possibly reduced) protein mass.
@@ -162,15 +179,15 @@ class ProteinLeakage(Scenario):
         cL = ML / V
         return (cP >= self.P.cP_star) and (cL <= self.P.cL_star)
 
-    def rhs(self, x, u, t):
+    def _rhs_full(self, z, u, t):
         """
-        Plant dynamics with protein leakage modeled.
+        Plant dynamics with protein leakage on the full state z = [V, ML, MP].
         """
-        V, ML = x
+        V, ML, MP = z
         V_safe = max(V, 1e-6)  # avoid division by zero
 
         # compute concentrations
-        cP = self.MP_cur / V_safe
+        cP = MP / V_safe
         cL = ML / V_safe
 
         # compute permeate flux and water inflow
@@ -181,7 +198,7 @@ class ProteinLeakage(Scenario):
         cL_p = lactose_permeate_conc(cL, p, self.P)
 
         # compute protein permeate concentration using leakage formula
-        exp_term = np.exp(p / (self.kM_P * self.P.A))
+        exp_term = math.exp(p / (self.kM_P * self.P.A))   # scalar: no ufunc dispatch
         cP_p = (self.beta * cP) / (1 + (self.beta - 1) * exp_term)
 
         # compute rate of change
@@ -189,7 +206,19 @@ class ProteinLeakage(Scenario):
         dML_dt = -cL_p * p                 # lactose loss
         dMP_dt = -cP_p * p                 # protein loss (leaked out)
 
-        # update internal protein tracker
-        self.MP_cur += dMP_dt * self.P.dt_ctrl
+        return np.array([dV_dt, dML_dt, dMP_dt])
 
-        return np.array([dV_dt, dML_dt])
+    def rhs(self, x, u, t):
+        """
+        [dV/dt, dML/dt] at the current protein mass (no side effects).
+        """
+        return self._rhs_full(np.array([x[0], x[1], self.MP_cur]), u, t)[:2]
+
+    def step(self, x, u, t, dt):
+        """
+        RK4 step of [V, ML, MP] together, so every stage sees a consistent
+        protein mass; stores the new MP and returns the next [V, ML].
+        """
+        z = rk4_step(np.array([x[0], x[1], self.MP_cur]), u, dt, self._rhs_full, t)
+        self.MP_cur = z[2]
+        return z[:2]
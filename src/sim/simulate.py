@@ -21,14 +21,180 @@ import numpy as np
 from typing import Callable
 
 from core.params     import default as P_default
-from core.discretise import rk4_step
+from core.discretise import rk4_step_scalar
+from core.jit        import njit
 from control.builder import build_mpc
+from control.controller import MPCController
 from sim.scenarios   import Scenario
 from core.tariff     import lambda_tou
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Simulation engine
 # ─────────────────────────────────────────────────────────────────────────────
+@njit
+def _simulate_const_u(V, ML, u, dt, cP_star, cL_star, MP, k, A, cg, kM_L, alpha):
+    """
+    Open-loop kernel for a constant input on the nominal model.
+    The trailing arguments are ``ProcessParams.model_args()``.
+
+    V[0], ML[0] hold the initial state; the arrays are filled in place.
+    Returns ``(n, stopped)``: the number of stored samples and whether the
+    specs were met at sample n-1 (early stop as in simulate).
+    """
+    steps = V.shape[0]
+    v, ml = V[0], ML[0]
+    for i in range(steps):
+        V[i], ML[i] = v, ml
+        if MP / v >= cP_star and ml / v <= cL_star:
+            return i + 1, True
+        v, ml = rk4_step_scalar(v, ml, u, dt, MP, k, A, cg, kM_L, alpha)
+    return steps, False
+
+
+@njit
+def _simulate_threshold(V, ML, U, dt, cP_star, cL_star, MP_ctrl, threshold, u_high,
+                        MP, k, A, cg, kM_L, alpha):
+    """
+    Closed-loop kernel for `threshold_policy` on the nominal model:
+    u = u_high once MP_ctrl / V ≥ threshold, else 0 (MP_ctrl is the
+    policy's own protein mass, as in the Python controller).
+
+    Fills V, ML (V[0], ML[0] = initial state) and U in place and returns
+    ``(n, stopped)`` as `_simulate_const_u`.
+    """
+    steps = V.shape[0]
+    v, ml = V[0], ML[0]
+    for i in range(steps):
+        V[i], ML[i] = v, ml
+        if MP / v >= cP_star and ml / v <= cL_star:
+            return i + 1, True
+        u = u_high if MP_ctrl / v >= threshold else 0.0
+        U[i] = u
+        v, ml = rk4_step_scalar(v, ml, u, dt, MP, k, A, cg, kM_L, alpha)
+    return steps, False
+
+
+def _has_nominal_dynamics(scenario: Scenario) -> bool:
+    """True if the scenario uses the unmodified base-class rhs / step / specs check."""
+    cls = type(scenario)
+    return (cls.rhs is Scenario.rhs and cls.step is Scenario.step
+            and cls.specs_met is Scenario.specs_met)
+
+
+def _simulate_batch(policy, params_seq, tf, dt):
+    """
+    Closed-loop runs on the nominal model for many parameter sets at once.
+
+    ``policy(V) → u`` maps the current volumes (B,) to inputs (scalar or
+    (B,)).  All trajectories advance together through the elementwise RK4
+    kernel; each one stops (freezes) at the first sample meeting the
+    specs, as in `simulate`.  ``tf`` / ``dt`` default to the first
+    parameter set (the nominal set for an empty batch).
+    """
+    params_seq = list(params_seq)
+    P0 = params_seq[0] if params_seq else P_default
+    tf = P0.t_final if tf is None else tf
+    dt = P0.dt_ctrl if dt is None else dt
+    steps = int(tf / dt) + 1
+    if not params_seq:                          # empty batch: (steps, 0) arrays
+        return (np.arange(steps) * dt, np.empty((steps, 0)), np.empty((steps, 0)),
+                np.empty(0, dtype=int))
+
+    # one column per trajectory: model constants, specs, initial state
+    args = tuple(np.array(col) for col in zip(*(p.model_args() for p in params_seq)))
+    cP_star = np.array([p.cP_star for p in params_seq])
+    cL_star = np.array([p.cL_star for p in params_seq])
+    B = len(params_seq)
+
+    V, ML = np.empty((steps, B)), np.empty((steps, B))
+    v  = np.array([p.V0  for p in params_seq])
+    ml = np.array([p.ML0 for p in params_seq])
+    n      = np.full(B, steps)
+    active = np.ones(B, dtype=bool)
+    MP     = args[0]
+
+    for i in range(steps):
+        V[i], ML[i] = v, ml
+        met = active & (MP / v >= cP_star) & (ml / v <= cL_star)
+        n[met] = i + 1
+        active &= ~met
+        if not active.any() or i == steps - 1:
+            V[i + 1:], ML[i + 1:] = v, ml        # freeze the remaining rows
+            break
+        v_n, ml_n = rk4_step_scalar(v, ml, policy(v), dt, *args)
+        v, ml = np.where(active, v_n, v), np.where(active, ml_n, ml)
+
+    return np.arange(steps) * dt, V, ML, n
+
+
+def simulate_const_u_batch(u, params_seq, tf: float | None = None,
+                           dt: float | None = None):
+    """
+    Open-loop constant-input runs on the nominal model for many parameter
+    sets at once (parametric sweeps, Monte-Carlo draws).  ``u`` is one
+    input for all runs or an array (B,) with one input per run, e.g.
+    ``simulate_const_u_batch(u_vals, [P] * len(u_vals))``.
+
+    Returns
+    -------
+    t : np.ndarray            – common time grid
+    V, ML : np.ndarray        – (len(t), B) trajectories, frozen after stop
+    n : np.ndarray[int]       – number of valid samples per trajectory
+    """
+    u = np.clip(np.asarray(u, dtype=float), 0.0, 1.0)
+    return _simulate_batch(lambda v: u, params_seq, tf, dt)
+
+
+def simulate_threshold_batch(rule: tuple, params_seq, tf: float | None = None,
+                             dt: float | None = None):
+    """
+    `threshold_policy` runs on the nominal model for many parameter sets
+    at once.  ``rule`` is the policy's ``threshold_rule`` attribute
+    (MP, threshold, u_high).  Returns the same as `simulate_const_u_batch`.
+    """
+    MP_ctrl, threshold, u_high = rule
+    u_high = float(np.clip(u_high, 0.0, 1.0))
+    return _simulate_batch(lambda v: np.where(MP_ctrl / v >= threshold, u_high, 0.0),
+                           params_seq, tf, dt)
+
+
+def open_loop_batch(
+    x0: np.ndarray,
+    u_schedule: np.ndarray,
+    params=P_default,
+    dt: float | None = None,
+) -> np.ndarray:
+    """
+    Nominal open-loop trajectories for B initial states (no early stop).
+
+    Parameters
+    ----------
+    x0 : ndarray(B, 2)
+        Initial states [V, ML].
+    u_schedule : ndarray(K,) or ndarray(K, B)
+        Input per step, shared by all trajectories or one column each.
+    params : ProcessParams
+    dt : float, optional
+        Step size [s]; defaults to params.dt_ctrl.
+
+    Returns
+    -------
+    X : ndarray(K+1, B, 2) – states at every step
+    """
+    dt = params.dt_ctrl if dt is None else dt
+    x0 = np.atleast_2d(np.asarray(x0, dtype=float))
+    u_schedule = np.clip(np.asarray(u_schedule, dtype=float), 0.0, 1.0)
+    args = params.model_args()
+
+    X = np.empty((len(u_schedule) + 1, *x0.shape))
+    X[0] = x0
+    V, ML = X[0, :, 0], X[0, :, 1]
+    for k, u in enumerate(u_schedule):
+        V, ML = rk4_step_scalar(V, ML, u, dt, *args)
+        X[k + 1, :, 0], X[k + 1, :, 1] = V, ML
+    return X
+
+
 def simulate(
     controller: Callable[[np.ndarray], float],
     scenario  : Scenario,
@@ -61,33 +227,69 @@ def simulate(
         Control inputs over time.
     """
     P   = scenario.P
-    tf  = tf or P.t_final
-    dt  = dt or P.dt_ctrl
+    tf  = P.t_final if tf is None else tf
+    dt  = P.dt_ctrl if dt is None else dt
     steps = int(tf / dt) + 1
 
-    # initialize logs
-    t = np.empty(steps)
+    # fast path: constant input on nominal dynamics → one compiled loop
+    u_const = getattr(controller, "u_const", None)
+    if u_const is not None and _has_nominal_dynamics(scenario):
+        u = float(np.clip(u_const, 0.0, 1.0))
+        V, ML = np.empty(steps), np.empty(steps)
+        V[0], ML[0] = P.V0, P.ML0
+        n, stopped = _simulate_const_u(V, ML, u, dt, P.cP_star, P.cL_star,
+                                       *P.model_args())
+        # no input after an early stop (may happen at the last sample too)
+        return np.arange(n) * dt, V[:n], ML[:n], np.full(n - 1 if stopped else n, u)
+
+    # fast path: threshold policy on nominal dynamics → compiled closed loop
+    rule = getattr(controller, "threshold_rule", None)
+    if rule is not None and _has_nominal_dynamics(scenario):
+        MP_ctrl, threshold, u_high = rule
+        V, ML, U = np.empty(steps), np.empty(steps), np.empty(steps)
+        V[0], ML[0] = P.V0, P.ML0
+        n, stopped = _simulate_threshold(V, ML, U, dt, P.cP_star, P.cL_star,
+                                         float(MP_ctrl), float(threshold),
+                                         float(np.clip(u_high, 0.0, 1.0)),
+                                         *P.model_args())
+        return np.arange(n) * dt, V[:n], ML[:n], U[:n - 1 if stopped else n]
+
+    # initialize logs (preallocated; sliced on early stop)
+    t = np.arange(steps) * dt
     V = np.empty(steps)
     ML = np.empty(steps)
-    u_hist = []
+    u_hist = np.empty(steps)
 
     # initial state
     x = np.array([P.V0, P.ML0])
 
+    # nominal dynamics → compiled scalar RK4 step instead of rhs callbacks
+    nominal    = _has_nominal_dynamics(scenario)
+    model_args = P.model_args()
+    scen_step  = scenario.step              # bound once, not per step
+
+    # stateful controllers (e.g. warm-started MPC) and plants (e.g. leaked
+    # protein mass) start every batch afresh
+    if hasattr(controller, "reset"):
+        controller.reset()
+    scenario.reset()
+
     for k in range(steps):
-        t[k] = k * dt
         V[k], ML[k] = x
 
         if scenario.specs_met(x):  # stop early if product is already good
-            return t[:k+1], V[:k+1], ML[:k+1], np.array(u_hist)
+            return t[:k+1], V[:k+1], ML[:k+1], u_hist[:k]
 
         u = float(np.clip(controller(x), 0.0, 1.0))  # ensure u ∈ [0,1]
-        u_hist.append(u)
+        u_hist[k] = u
 
         # RK4 time integration using current scenario dynamics
-        x = rk4_step(x, u, dt, lambda s, uu: scenario.rhs(s, uu, t[k]))
+        if nominal:
+            x = np.array(rk4_step_scalar(x[0], x[1], u, dt, *model_args))
+        else:
+            x = scen_step(x, u, t[k], dt)
 
-    return t, V, ML, np.array(u_hist)
+    return t, V, ML, u_hist
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -96,7 +298,9 @@ def simulate(
 
 def constant_u(u_val: float) -> Callable[[np.ndarray], float]:
     """Returns a controller that always applies a constant u."""
-    return lambda _: u_val
+    ctrl = lambda _: u_val
+    ctrl.u_const = u_val        # lets simulate() use the compiled loop
+    return ctrl
 
 
 def threshold_policy(threshold: float = 55.0, u_high: float = 0.86):
@@ -106,10 +310,12 @@ def threshold_policy(threshold: float = 55.0, u_high: float = 0.86):
     - otherwise → close valve (u = 0.0)
     """
     from core.params import default as P
+    MP = P.MP                  # the rule always uses the nominal protein mass
     def _ctrl(x):
         V, _ = x
-        cP = P.MP / V
+        cP = MP / V
         return u_high if cP >= threshold else 0.0
+    _ctrl.threshold_rule = (MP, threshold, u_high)  # lets simulate() compile the loop
     return _ctrl
 
 
@@ -117,41 +323,47 @@ def threshold_policy(threshold: float = 55.0, u_high: float = 0.86):
 # Generic MPC controller wrapper
 # ─────────────────────────────────────────────────────────────────────────────
 
-class _MPCController:
+class _MPCController(MPCController):
     """
-    Wraps a CasADi NLP solver into a Python controller function.
-
-    After solving the MPC optimization problem, it extracts u₀ (first input).
+    Build an MPC of the given mode with `build_mpc` and wrap it.
+    Extra keywords (solver, codegen, jit, weights) go to `build_mpc`.
     """
-    def __init__(self, mode: str, N: int, params=P_default):
-        self.solver, self.meta, self.LBG, self.UBG = build_mpc(
-            mode=mode, horizon=N, params=params
+    def __init__(
+        self,
+        mode: str,
+        N: int,
+        params=P_default,
+        event_tol: float | None = None,
+        **build_kw,
+    ):
+        super().__init__(
+            *build_mpc(mode=mode, horizon=N, params=params, **build_kw),
+            event_tol=event_tol,
         )
 
-    def __call__(self, state: np.ndarray) -> float:
-        import numpy as np
-        x_init = np.tile(state, self.meta["N"] + 1)           # initial guess for states
-        var_init = np.hstack([x_init, self.meta["u_init"]])   # full init guess vector
-        sol = self.solver(x0=var_init, p=state, lbg=self.LBG, ubg=self.UBG)
-        # return the first control action from optimized sequence
-        return float(sol["x"].full().ravel()[self.meta["Uslice"]][0])
-
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Specific MPC controller presets
 # ─────────────────────────────────────────────────────────────────────────────
 
-def mpc_spec(N=20, params=P_default):
+# Keyword options shared by the presets below
+#   event_tol : event-triggered re-solving (see MPCController)
+#   **build_kw: solver="ipopt"|"sqpmethod", codegen=True, jit=True …
+#               forwarded to control.builder.build_mpc
+
+def mpc_spec(N=20, params=P_default, *, event_tol=None, **build_kw):
     """Quadratic spec-tracking MPC."""
-    return _MPCController("spec", N, params)
+    return _MPCController("spec", N, params, event_tol, **build_kw)
 
-def mpc_time_opt(N: int = 20, *, params=P_default):
+def mpc_time_opt(
+    N: int = 20, *, params=P_default, event_tol: float | None = None, **build_kw
+):
     """Time-optimal MPC (objective: maximize cP, minimize cL and time)."""
-    return _MPCController("time_opt", N, params)
+    return _MPCController("time_opt", N, params, event_tol, **build_kw)
 
-def mpc_econ(N=20, params=P_default):
+def mpc_econ(N=20, params=P_default, *, event_tol=None, **build_kw):
     """Linear-cost economic MPC."""
-    return _MPCController("econ", N, params)
+    return _MPCController("econ", N, params, event_tol, **build_kw)
 
 def mpc_economic(N=20, *, params=P_default, lam_fun=lambda_tou):
     """
@@ -160,5 +372,5 @@ def mpc_economic(N=20, *, params=P_default, lam_fun=lambda_tou):
     """
     return _MPCController(
         "spec", N, params,
-        extra_weights=dict(lambda_fun=lam_fun)  # NOTE: this requires support in build_mpc
+        weights=dict(lambda_fun=lam_fun),       # TOU term added by build_mpc
     )
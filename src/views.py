@@ -4,21 +4,21 @@
 from __future__ import annotations
 
 import numpy as np
-import matplotlib.pyplot as plt
+import matplotlib
+from matplotlib.figure import Figure
 import streamlit as st
 
 # Core components and controller tools
 from core.params import default as P
-from core.tariff import lambda_tou  # Time-of-use electricity tariff
+from core.tariff import lambda_tou, lambda_tou_vec  # Time-of-use electricity tariff
 from control.builder import build_mpc
-from control import mpc_robust
+from control import build_robust_mpc, MPCController
 
 # Simulation and scenario imports
 from sim import (
     simulate,
-    constant_u,
+    simulate_const_u_batch,
     threshold_policy,
-    mpc_time_opt,
     Nominal,
     Tear,
     KmMismatch,
@@ -28,35 +28,121 @@ from sim import (
 # Monte-Carlo simulation
 from experiments.montecarlo import run as mc_run
 
+# Headless rendering: panels go straight to PNG via Agg.  Long trajectories
+# are simplified to the pixels they cover and drawn in chunks.
+matplotlib.use("Agg")
+matplotlib.rcParams.update({
+    "path.simplify":           True,
+    "path.simplify_threshold": 1.0,
+    "agg.path.chunksize":      10000,
+})
+
 # ─────────────────────────── Utility Functions ─────────────────────────────
 
 def batch_time(t: np.ndarray, cP: np.ndarray, cL: np.ndarray, tol: float = 1e-3) -> float:
     """Return duration (in hours) to meet spec constraints or end of run."""
-    idx = np.where((cP >= P.cP_star - tol) & (cL <= P.cL_star + tol))[0]
-    done = idx[0] if idx.size else len(t) - 1
+    mask = (cP >= P.cP_star - tol) & (cL <= P.cL_star + tol)
+    done = int(np.argmax(mask)) if mask.any() else len(t) - 1   # first hit
     return t[done] / 3600
 
-def spec_controller(N: int, *, rho_time: float = 0.10, params=P):
-    """Returns standard spec-tracking MPC controller with quadratic objective."""
-    solver, meta, LBG, UBG = build_mpc(N, weights=dict(rho_time=rho_time), params=params)
-
-    def _ctrl(state: np.ndarray) -> float:
-        x0 = np.hstack([np.tile(state, meta["N"] + 1), meta["u_init"]])
-        sol = solver(x0=x0, p=state, lbg=LBG, ubg=UBG)
-        return float(sol["x"].full().ravel()[meta["Uslice"]][0])
+def new_axes(figsize=(4, 3)):
+    """
+    Figure with a single axes, created outside pyplot's global figure
+    registry: nothing accumulates across reruns and no plt.close is needed.
+    """
+    fig = Figure(figsize=figsize)
+    return fig, fig.subplots()
+
+# ───────────────────────── cached solver builds ────────────────────────────
+# Streamlit re-executes the page on every widget change; the NLP solvers are
+# kept across reruns (and sessions) and only the thin controller wrappers
+# are recreated.  cache_resource shares the solver object itself instead of
+# pickling a copy out of the cache on every hit as cache_data would.
+
+@st.cache_resource(show_spinner=False)
+def _build_spec(N: int, rho_time: float, params=P):
+    """Spec-tracking NLP → (solver, meta, LBG, UBG)."""
+    return build_mpc(N, weights=dict(rho_time=rho_time), params=params)
+
+@st.cache_resource(show_spinner=False)
+def _build_econ(N: int, params=P):
+    """TOU economic NLP → (solver, meta, LBG, UBG)."""
+    return build_mpc("econ", N, params=params, weights=dict(lambda_fun=lambda_tou))
+
+@st.cache_resource(show_spinner=False)
+def _build_robust(N: int):
+    """Tube-tightened robust NLP → (solver, meta, LBG, UBG)."""
+    return build_robust_mpc(horizon=N, params=P)
+
+@st.cache_resource(show_spinner=False)
+def _build_timeopt(N: int):
+    """Time-optimal NLP → (solver, meta, LBG, UBG)."""
+    return build_mpc(mode="time_opt", horizon=N, params=P)
 
-    return _ctrl
+def spec_controller(N: int, *, rho_time: float = 0.10, params=P):
+    """
+    Returns standard spec-tracking MPC controller with quadratic objective.
+    Each step warm-starts IPOPT from the previous solution shifted by one
+    stage (cold start only on the first call after a reset).
+    """
+    return MPCController(*_build_spec(N, rho_time, params))
 
 def econ_controller(N: int, *, params=P):
-    """Returns economic MPC controller minimizing TOU electricity costs."""
-    solver, meta, LBG, UBG = build_mpc("econ", N, params=params, weights=dict(lambda_fun=lambda_tou))
-
-    def _ctrl(state: np.ndarray) -> float:
-        x0 = np.hstack([np.tile(state, meta["N"] + 1), meta["u_init"]])
-        sol = solver(x0=x0, p=state, lbg=LBG, ubg=UBG)
-        return float(sol["x"].full().ravel()[meta["Uslice"]][0])
-
-    return _ctrl
+    """Returns economic MPC controller minimizing TOU electricity costs (warm-started)."""
+    return MPCController(*_build_econ(N, params))
+
+def robust_controller(N: int):
+    """Warm-started tube MPC on the cached robust solver."""
+    return MPCController(*_build_robust(N))
+
+def timeopt_controller(N: int):
+    """Warm-started time-optimal MPC on the cached solver."""
+    return MPCController(*_build_timeopt(N))
+
+# ───────────────────────── sweeps ──────────────────────────────────────────
+# Each sweep point simulates an independent batch on the cached solvers
+# above.  The points run in this process: workers outside the Streamlit
+# runtime would rebuild every NLP, and one solver is not safe to call from
+# several threads at once.
+
+def _sim_spec(N: int):
+    """Tracking-MPC batch on the nominal plant (sweep point)."""
+    return simulate(spec_controller(N), Nominal(P))
+
+def _sim_km_mismatch(factor: float):
+    """Economic-MPC batch on a plant with scaled kM_L (sweep point)."""
+    return simulate(econ_controller(20), KmMismatch(factor, P))
+
+# ───────────────────────── cached simulation runs ──────────────────────────
+# Closed-loop runs are deterministic in (controller, horizon, plant), so the
+# pages look them up by those plain keys; a slider move only re-simulates
+# the sections that depend on it.  Outputs are arrays, hence cache_data.
+
+_CONTROLLERS = {
+    "spec":      spec_controller,
+    "econ":      econ_controller,
+    "time_opt":  timeopt_controller,
+    "threshold": lambda N: threshold_policy(),
+}
+
+_SCENARIOS = {
+    "nominal":  lambda arg: Nominal(P),
+    "tear":     lambda arg: Tear(P),
+    "mismatch": lambda arg: KmMismatch(arg, P),
+    "leakage":  lambda arg: ProteinLeakage(),
+}
+
+@st.cache_data(show_spinner=False)
+def cached_sim(kind: str, N: int = 20, scenario: str = "nominal", arg: float | None = None):
+    """`simulate` of a named controller on a named plant → (t, V, ML, u)."""
+    return simulate(_CONTROLLERS[kind](N), _SCENARIOS[scenario](arg))
+
+_SWEEPS = {"spec": _sim_spec, "mismatch": _sim_km_mismatch}
+
+@st.cache_data(show_spinner=False)
+def cached_sweep(kind: str, items: tuple) -> list:
+    """A named sweep point function mapped over `items` → list of runs."""
+    return [_SWEEPS[kind](x) for x in items]
 
 # ───────────────────────── realistic energy & cost ─────────────────────────
 def energy_cost(
@@ -80,8 +166,6 @@ def energy_cost(
     ----------------
     Uses the *continuous* tariff λ(t) from core.tariff.lambda_tou.
     """
-    from core.tariff import lambda_tou  # local import to avoid cycles
-
     # guard against 1-sample mismatch (same logic used in plot_charts)
     if len(u) < len(t):
         pad = np.full(len(t) - len(u), u[-1] if len(u) else 0.0)
@@ -94,11 +178,12 @@ def energy_cost(
 
     # instantaneous power  [kW]  and energy  [kWh]
     power_kw = pump_idle_kw + pump_dyn_kw * u_use
-    energy_kwh = np.sum(power_kw * dt) / 3600.0
+    e_step = power_kw * dt                      # kW·s per step, reused below
+    energy_kwh = e_step.sum() / 3600.0
 
-    # cost: ∑  P_k · Δt_k · λ(t_k)
-    price = np.vectorize(lambda_tou)(t)
-    cost_eur = float(np.sum(power_kw * dt * price) / 3600.0)
+    # cost: ∑  P_k · Δt_k · λ(t_k)  as one dot product
+    price = lambda_tou_vec(t)
+    cost_eur = float(np.dot(e_step, price) / 3600.0)
 
     return cost_eur, energy_kwh
 
@@ -114,12 +199,14 @@ def show_open_loop() -> None:
         st.warning("Select at least one value."); return
 
     cols = st.columns(3, gap="small")
-    fig_cP, ax_cP = plt.subplots(figsize=(4, 3))
-    fig_cL, ax_cL = plt.subplots(figsize=(4, 3))
-    fig_V , ax_V  = plt.subplots(figsize=(4, 3))
-
-    for u in u_vals:
-        t, V, ML, _ = simulate(constant_u(u), Nominal(P))
+    fig_cP, ax_cP = new_axes()
+    fig_cL, ax_cL = new_axes()
+    fig_V , ax_V  = new_axes()
+
+    # all constant-u runs integrate together, one column per value
+    t_all, V_all, ML_all, n = simulate_const_u_batch(u_vals, [P] * len(u_vals))
+    for j, u in enumerate(u_vals):
+        t, V, ML = t_all[:n[j]], V_all[:n[j], j], ML_all[:n[j], j]
         cP, cL = P.MP / V, ML / V
         label = f"u = {u:.2f}"
         ax_cP.plot(t/3600, cP, label=label)
@@ -140,6 +227,15 @@ def show_open_loop() -> None:
 
 # ──────────────────────────── Generic Chart Plotting ───────────────────────
 
+# Panels of the comparison charts: (quantity, y-label, reference lines as
+# (value, line style, colour, legend label))
+_PANELS = (
+    ("cP", "Protein cP  [mol m⁻³]", ((P.cP_star, "--", "grey", "cP target 100"),)),
+    ("cL", "Lactose cL  [mol m⁻³]", ((P.cL_star, "--", "grey", "cL target 15"),
+                                      (P.cL_max,  ":",  "r",    "cL max 570"))),
+    ("u",  "Control u",             ()),
+)
+
 # ──────────────────────────── Unified plotting helper ──────────────────────
 
 def plot_charts(
@@ -152,10 +248,10 @@ def plot_charts(
     highlight_tear: bool = False,
 ) -> None:
     """
-    Show three *separate* 4×3-inch panels (cL, cP, u) in a single row.
+    Show three 4×3-inch panels (cP, cL, u) in a single row.
     
     Notes:
-      - One Streamlit column per metric.
+      - One 12×3-inch figure with three subplots, rendered and sent once.
       - Each panel has its own legend.
       - Control vector `u` is padded if one sample shorter than `t`.
       - Tear window shading (30 ≤ cP ≤ 60) applied before rendering.
@@ -175,47 +271,33 @@ def plot_charts(
     t0, t1 = None, None
     if highlight_tear:
         mask = (cP >= 30.0) & (cP <= 60.0)
-        if np.any(mask):
-            i0 = np.argmax(mask)               # first True
-            i1 = i0 + np.argmax(~mask[i0:])    # first False after i0
+        if mask.any():
+            # last index before every switch of the mask, in one pass
+            edges = np.flatnonzero(np.diff(mask.view(np.int8)))
+            i0 = 0 if mask[0] else edges[0] + 1          # first True
+            ends = edges[edges >= i0]
+            i1 = ends[0] + 1 if ends.size else len(mask) - 1   # first False after i0
             t0, t1 = time_h[i0], time_h[i1]
 
-    # ─────────────────── Streamlit layout with 3 columns ─────────────────
+    # ─────────────────── One figure, three panels ────────────────────────
     st.markdown(f"**{title}**")
-    col_cP, col_cL, col_u = st.columns(3, gap="small")
-
-    # Panel 1 – Protein concentration
-    fig, ax = plt.subplots(figsize=(4, 3))
-    ax.plot(time_h, cP, color="C1", label="cP")
-    ax.axhline(P.cP_star, ls="--", color="grey", label="cP target 100")
-    if t0 is not None:
-        ax.axvspan(t0, t1, color="yellow", alpha=0.30, label="Disturbance period")
-    ax.set_ylabel("Protein cP  [mol m⁻³]")
-    ax.set_xlabel("Time [h]")
-    ax.legend(loc="best")
-    col_cP.pyplot(fig, use_container_width=True)
-
-    # Panel 2 – Lactose concentration
-    fig, ax = plt.subplots(figsize=(4, 3))
-    ax.plot(time_h, cL, color="C0", label="cL")
-    ax.axhline(P.cL_star, ls="--", color="grey", label="cL target 15")
-    ax.axhline(P.cL_max, ls=":", color="r", label="cL max 570")
-    if t0 is not None:
-        ax.axvspan(t0, t1, color="yellow", alpha=0.30, label="Disturbance period")
-    ax.set_ylabel("Lactose cL  [mol m⁻³]")
-    ax.set_xlabel("Time [h]")
-    ax.legend(loc="best")
-    col_cL.pyplot(fig, use_container_width=True)
-
-    # Panel 3 – Control trajectory
-    fig, ax = plt.subplots(figsize=(4, 3))
-    ax.step(time_h, u_plot, where="post", color="C2", label="u")
-    if t0 is not None:
-        ax.axvspan(t0, t1, color="yellow", alpha=0.30, label="Disturbance period")
-    ax.set_ylabel("Control u")
-    ax.set_xlabel("Time [h]")
-    ax.legend(loc="best")
-    col_u.pyplot(fig, use_container_width=True)
+    fig = Figure(figsize=(12, 3), layout="constrained")
+    series = dict(cP=cP, cL=cL, u=u_plot)
+    for ax, (key, ylabel, refs), color in zip(fig.subplots(1, 3), _PANELS,
+                                               ("C1", "C0", "C2")):
+        if key == "u":
+            ax.step(time_h, series[key], where="post", color=color, label=key)
+        else:
+            ax.plot(time_h, series[key], color=color, label=key)
+        for y, ls, c, lbl in refs:
+            ax.axhline(y, ls=ls, color=c, label=lbl)
+        if t0 is not None:
+            ax.axvspan(t0, t1, color="yellow", alpha=0.30, label="Disturbance period")
+        ax.set_ylabel(ylabel)
+        ax.set_xlabel("Time [h]")
+        ax.legend(loc="best")
+
+    st.pyplot(fig, use_container_width=True)
 
 # ──────────────────────────────── MPC Page ─────────────────────────────────
 
@@ -226,7 +308,7 @@ def show_mpc() -> None:
     # 1.1. Tracking MPC
     st.markdown("---"); st.markdown("### 1.1. Tracking MPC")
     N = st.slider("Prediction horizon N", 5, 50, 20)
-    t_b, V_b, ML_b, u_b = simulate(spec_controller(N), Nominal(P))
+    t_b, V_b, ML_b, u_b = cached_sim("spec", N)
     cP_b, cL_b = P.MP / V_b, ML_b / V_b
     plot_charts("Tracking MPC", t_b, cP_b, cL_b, u_b)
     st.info(f"⏱️ Batch time **{batch_time(t_b, cP_b, cL_b):.2f} h**")
@@ -234,60 +316,37 @@ def show_mpc() -> None:
     # 1.2. Tracking MPC fixed N
     st.markdown("---"); st.markdown("### 1.2. Tracking MPC (N=5,20,50)")
 
-    data ={}
     Ns = [5, 20, 50]
-    for n in Ns:
-        t_b, V_b, ML_b, u_b = simulate(spec_controller(n), Nominal(P))
-        cP_b, cL_b = P.MP / V_b, ML_b / V_b
-        data[f't_n{n}'] = t_b / 3600.0
-        data[f'cP_n{n}'] = cP_b
-        data[f'cL_n{n}'] = cL_b
-        data[f'u_n{n}'] = u_b
-
-    # # Define colors and labels for each N
-    colors = ['tab:blue', 'tab:orange', 'tab:green']
+    runs = {}
+    for n, (t_n, V_n, ML_n, u_n) in zip(Ns, cached_sweep("spec", tuple(Ns))):
+        runs[n] = dict(t=t_n, cP=P.MP / V_n, cL=ML_n / V_n, u=u_n)
 
-    col_cP, col_cL, col_u = st.columns(3, gap="small")
-
-    # Panel 1 – Protein concentration
-    fig, ax = plt.subplots(figsize=(4, 3))
-    for i, n in enumerate(Ns):
-        ax.plot(data[f't_n{n}'], data[f'cP_n{n}'], label=f'N={n}', color=colors[i])
-    ax.axhline(P.cP_star, ls="--", color="grey", label="cP target 100")
-    ax.set_ylabel("Protein cP  [mol m⁻³]")
-    ax.set_xlabel("Time [h]")
-    ax.legend(loc="best")
-    col_cP.pyplot(fig, use_container_width=True)
-
-    # Panel 2 – Lactose concentration
-    fig, ax = plt.subplots(figsize=(4, 3))
-    for i, n in enumerate(Ns):
-        ax.plot(data[f't_n{n}'], data[f'cL_n{n}'], label=f'N={n}', color=colors[i])
-    ax.axhline(P.cL_star, ls="--", color="grey", label="cL target 15")
-    ax.axhline(P.cL_max, ls=":", color="r", label="cL max 570")
-    ax.set_ylabel("Lactose cL  [mol m⁻³]")
-    ax.set_xlabel("Time [h]")
-    ax.legend(loc="best")
-    col_cL.pyplot(fig, use_container_width=True)
-
-    # Panel 3 – Control trajectory
-    fig, ax = plt.subplots(figsize=(4, 3))
-    for i, n in enumerate(Ns):
-        t = data[f't_n{n}']
-        u = data[f'u_n{n}']
-        min_len = min(len(t), len(u))
-        ax.step(t[:min_len], u[:min_len], label=f'N={n}', where='post', color=colors[i])
-    ax.set_ylabel("Control u")
-    ax.set_xlabel("Time [h]")
-    ax.legend(loc="best")
-    col_u.pyplot(fig, use_container_width=True)
+    # one panel per quantity, one line per horizon
+    colors = ['tab:blue', 'tab:orange', 'tab:green']
+    for col, (key, ylabel, refs) in zip(st.columns(3, gap="small"), _PANELS):
+        fig, ax = new_axes()
+        for color, n in zip(colors, Ns):
+            r = runs[n]
+            t_h = r["t"] / 3600.0
+            if key == "u":
+                m = min(len(t_h), len(r["u"]))
+                ax.step(t_h[:m], r["u"][:m], label=f'N={n}', where='post', color=color)
+            else:
+                ax.plot(t_h, r[key], label=f'N={n}', color=color)
+        for y, ls, c, lbl in refs:
+            ax.axhline(y, ls=ls, color=c, label=lbl)
+        ax.set_ylabel(ylabel)
+        ax.set_xlabel("Time [h]")
+        ax.legend(loc="best")
+        col.pyplot(fig, use_container_width=True)
 
     for n in Ns:
-        st.info(f"⏱️ Batch time of Tracking MPC with N={n}: **{batch_time(data[f't_n{n}']*3600.0, data[f'cP_n{n}'], data[f'cL_n{n}']):.2f} h**")
+        r = runs[n]
+        st.info(f"⏱️ Batch time of Tracking MPC with N={n}: **{batch_time(r['t'], r['cP'], r['cL']):.2f} h**")
 
     # 2. Threshold policy comparison
     st.markdown("---"); st.markdown("### 2. Threshold policy ($u=0.86$ if $c_P\\ge55$)")
-    t_th, V_th, ML_th, u_th = simulate(threshold_policy(), Nominal(P))
+    t_th, V_th, ML_th, u_th = cached_sim("threshold")
     cP_th, cL_th = P.MP / V_th, ML_th / V_th
     for lbl, t, cP, cL, u in [("MPC", t_b, cP_b, cL_b, u_b), ("Threshold", t_th, cP_th, cL_th, u_th)]:
         plot_charts(lbl, t, cP, cL, u)
@@ -295,7 +354,7 @@ def show_mpc() -> None:
     # 3. Time-optimal MPC
     st.markdown("---"); st.markdown("### 3. Time-optimal MPC")
     N_opt = st.slider("Horizon (time-opt.)", 5, 50, 20, key="topth")
-    t_to, V_to, ML_to, u_to = simulate(mpc_time_opt(N_opt), Nominal(P))
+    t_to, V_to, ML_to, u_to = cached_sim("time_opt", N_opt)
     cP_to, cL_to = P.MP / V_to, ML_to / V_to
     plot_charts("Time-optimal MPC", t_to, cP_to, cL_to, u_to)
     st.success(f"🏁 Time-opt batch **{batch_time(t_to, cP_to, cL_to):.2f} h**  "
@@ -304,7 +363,7 @@ def show_mpc() -> None:
     # 4. Economic MPC with tariff cost analysis
     st.markdown("---"); st.markdown("### 4. Economic MPC")
     N_econ = st.slider("Horizon (economic)", 5, 50, 20, key="econ")
-    t_e, V_e, ML_e, u_e = simulate(econ_controller(N_econ), Nominal(P))
+    t_e, V_e, ML_e, u_e = cached_sim("econ", N_econ)
     cP_e, cL_e = P.MP / V_e, ML_e / V_e
     plot_charts("Economic MPC", t_e, cP_e, cL_e, u_e)
 
@@ -326,7 +385,7 @@ def show_tests() -> None:
 
     # 1. Filter-cake tear scenario
     st.subheader("1. Filter-cake tear disturbance")
-    t, V, ML, u = simulate(econ_controller(20), Tear(P))
+    t, V, ML, u = cached_sim("econ", 20, "tear")
     plot_charts("Tear disturbance", t, P.MP / V, ML / V, u, highlight_tear=True)
 
     # 2. Plant-model mismatch scenario
@@ -334,17 +393,14 @@ def show_tests() -> None:
     tol = 1e-3
     summary = []
 
-    for factor in [0.75, 0.5, 0.25]:
-        scen = KmMismatch(factor, P)
-        t, V, ML, u = simulate(econ_controller(20), scen)
-        plot_charts(f"Mismatch factor {factor}", t, P.MP / V, ML / V, u)
-
-        cP = P.MP / V
-        cL = ML / V
+    factors = [0.75, 0.5, 0.25]
+    for factor, (t, V, ML, u) in zip(factors, cached_sweep("mismatch", tuple(factors))):
+        cP, cL = P.MP / V, ML / V              # shared by chart and summary
+        plot_charts(f"Mismatch factor {factor}", t, cP, cL, u)
 
         # 1️⃣ Check if spec constraints ever met
-        idx = np.where((cP >= P.cP_star - tol) & (cL <= P.cL_star + tol))[0]
-        spec_met = idx.size > 0
+        mask = (cP >= P.cP_star - tol) & (cL <= P.cL_star + tol)
+        spec_met = bool(mask.any())
 
         # 2️⃣ Check if path constraints were ever violated
         path_violated = np.any(cP > P.cP_star + tol) or np.any(cL > P.cL_max + tol)
@@ -353,7 +409,7 @@ def show_tests() -> None:
         ok = spec_met and not path_violated
 
         # Use first spec reach time if spec_met, else t_final
-        t_b = t[idx[0]] / 3600 if spec_met else P.t_final / 3600
+        t_b = t[np.argmax(mask)] / 3600 if spec_met else P.t_final / 3600
         peak = float(np.max(cL))
         summary.append((factor, ok, t_b, peak))
 
@@ -368,23 +424,23 @@ def show_tests() -> None:
 
     # 3. Protein leakage scenario
     st.subheader("3. Protein leakage")
-    scen = ProteinLeakage()
-    t, V, ML, u = simulate(econ_controller(20), scen)
+    t, V, ML, u = cached_sim("econ", 20, "leakage")
     plot_charts("Protein leakage", t, P.MP / V, ML / V, u)
 
     # 4. Monte-Carlo robustness test
     st.subheader("4. Monte-Carlo robustness")
     draws = st.slider("Number of random plants", 20, 300, 100, 20)
     if st.button("Run Monte-Carlo"):
-        ctrl = mpc_robust(20)
-        times, peaks, ok = mc_run(draws, ctrl)
+        ctrl = robust_controller(20)
+        # plants are independent: one warm-started controller copy per CPU
+        times, peaks, ok = mc_run(draws, ctrl, n_jobs=None)
 
         col_ok, col_t, col_p = st.columns(3)
         col_ok.metric("Pass-rate", f"{100*sum(ok)/len(ok):.1f} %")
         col_t.metric("Median time [h]", f"{np.median(times):.2f}")
         col_p.metric("90-perc peak $c_L$", f"{np.percentile(peaks, 90):.0f}")
 
-        fig, ax = plt.subplots(figsize=(6, 3))
+        fig, ax = new_axes((6, 3))
         ax.hist(times, bins=15, alpha=0.75)
         ax.set_xlabel("Batch time [h]"); ax.set_ylabel("# runs")
         st.pyplot(fig, use_container_width=True)
\ No newline at end of file